@@ -1,4 +1,4 @@
-from collections.abc import MutableMapping, MutableSet
+from collections.abc import Iterator, MutableMapping, MutableSet
 from functools import cached_property
 from pathlib import Path, PurePath
 from typing import cast
@@ -14,7 +14,7 @@ from ..models import (
     SectionDefinition,
     UnresolvedPath,
 )
-from ..utils import all_decks, load_yaml
+from ..utils import all_decks, find_files, load_yaml
 
 
 class SectionsAnalyzer:
@@ -22,35 +22,38 @@ class SectionsAnalyzer:
         self._shared_latex_dir = shared_latex_dir
         self._git_dir = git_dir
 
-    def unused_flavors(self) -> dict[UnresolvedPath, set[FlavorName]]:
-        unused_flavors = {
-            p: {f.name for f in d.flavors} for p, d in self._shared_sections.items()
-        }
+    def unused_flavors(
+        self,
+    ) -> Iterator[tuple[UnresolvedPath, tuple[FlavorName, ...]]]:
+        used_flavors: dict[UnresolvedPath, set[FlavorName]] = {}
         for section_stats in self._sections_usage.values():
             for section_flavors in section_stats.values():
                 for path, flavors in section_flavors.items():
-                    for flavor in flavors:
-                        if path in unused_flavors and flavor in unused_flavors[path]:
-                            unused_flavors[path].remove(flavor)
-                            if not unused_flavors[path]:
-                                del unused_flavors[path]
-        return unused_flavors
+                    used_flavors.setdefault(path, set()).update(flavors)
+        for path, definition in self._shared_sections.items():
+            unused = {f.name for f in definition.flavors}.difference(
+                used_flavors.get(path, ())
+            )
+            if unused:
+                yield path, tuple(sorted(unused))
 
     def parts_using_flavor(
         self,
         section: str,
         flavor: str | None,
-    ) -> dict[Path, set[PartName]]:
+    ) -> Iterator[tuple[Path, tuple[PartName, ...]]]:
         section_path = UnresolvedPath(PurePath(section))
-        using: dict[Path, set[PartName]] = {}
         for deck_path, section_stats in self._sections_usage.items():
-            for part_name, section_flavors in section_stats.items():
-                for path, flavors in section_flavors.items():
-                    if path == section_path and (flavor is None or flavor in flavors):
-                        if deck_path not in using:
-                            using[deck_path] = set()
-                        using[deck_path].add(part_name)
-        return using
+            using = tuple(
+                sorted(
+                    part_name
+                    for part_name, section_flavors in section_stats.items()
+                    if section_path in section_flavors
+                    and (flavor is None or flavor in section_flavors[section_path])
+                )
+            )
+            if using:
+                yield deck_path, using
 
     @cached_property
     def _decks(self) -> dict[Path, Deck]:
@@ -58,13 +61,18 @@ class SectionsAnalyzer:
 
     @cached_property
     def _shared_sections(self) -> dict[UnresolvedPath, SectionDefinition]:
-        result = {}
-        for path in self._shared_latex_dir.rglob("*.yml"):
-            content = load_yaml(path)
-            result[UnresolvedPath(path.parent.relative_to(self._shared_latex_dir))] = (
-                SectionDefinition.model_validate(content)
-            )
-        return result
+        from concurrent.futures import ThreadPoolExecutor
+
+        paths = list(find_files(self._shared_latex_dir, "*.yml"))
+        # Reading the definitions is I/O bound on a cold cache: overlap the reads
+        with ThreadPoolExecutor() as executor:
+            contents = executor.map(load_yaml, paths)
+            return {
+                UnresolvedPath(path.parent.relative_to(self._shared_latex_dir)): (
+                    SectionDefinition.model_validate(content)
+                )
+                for path, content in zip(paths, contents, strict=True)
+            }
 
     @cached_property
     def _sections_usage(
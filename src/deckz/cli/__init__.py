@@ -18,5 +18,6 @@ def main() -> None:
     )
     from ..utils import import_module_and_submodules
 
-    import_module_and_submodules(__name__)
+    # Only the command modules need importing, this package is already loaded
+    import_module_and_submodules(__name__, reload=False)
     app()
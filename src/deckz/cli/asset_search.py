@@ -14,6 +14,7 @@ def asset_search(asset: str, /, *, workdir: Path = Path()) -> None:
 
     """
     from rich.console import Console
+    from rich.markup import escape
 
     from ..components.factory import GlobalSettingsFactory
     from ..configuring.settings import GlobalSettings
@@ -24,9 +25,6 @@ def asset_search(asset: str, /, *, workdir: Path = Path()) -> None:
 
     assets_searcher = GlobalSettingsFactory(settings).assets_searcher()
     with console.status("Processing decks"):
-        result = assets_searcher.search(asset)
-
-    for path in result:
-        console.print(
-            f"[link=file://{path}]{path.relative_to(settings.paths.git_dir)}[/link]"
-        )
+        for path in assets_searcher.search(asset):
+            relative_path = escape(str(path.relative_to(settings.paths.git_dir)))
+            console.print(f"[link=file://{path}]{relative_path}[/link]")
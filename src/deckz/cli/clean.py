@@ -18,8 +18,9 @@ def clean(*, workdir: Path = Path()) -> None:
 
     logger = getLogger(__name__)
     settings = DeckSettings.from_yaml(workdir)
-    if not settings.paths.build_dir.exists():
+    try:
+        rmtree(settings.paths.build_dir)
+    except FileNotFoundError:
         logger.info(f"Nothing to do: {settings.paths.build_dir} doesn't exist")
     else:
-        logger.info(f"Deleting {settings.paths.build_dir}")
-        rmtree(settings.paths.build_dir)
+        logger.info(f"Deleted {settings.paths.build_dir}")
@@ -5,7 +5,7 @@ from . import app
 
 @app.command()
 def clean_all(*, workdir: Path = Path()) -> None:
-    """Wipe all build directories.
+    """Wipe all build directories, including the one of shared tikz figures.
 
     Args:
         workdir: Path to move into before running the command
@@ -14,12 +14,19 @@ def clean_all(*, workdir: Path = Path()) -> None:
     from logging import getLogger
     from shutil import rmtree
 
+    from ..configuring.settings import GlobalSettings
     from ..utils import all_deck_settings, get_git_dir
 
     logger = getLogger(__name__)
-    for settings in all_deck_settings(get_git_dir(workdir).resolve()):
-        if not settings.paths.build_dir.exists():
-            logger.info(f"Nothing to do: {settings.paths.build_dir} doesn't exist")
+    build_dirs = [
+        settings.paths.build_dir
+        for settings in all_deck_settings(get_git_dir(workdir).resolve())
+    ]
+    build_dirs.append(GlobalSettings.from_yaml(workdir).paths.tikz_build_dir)
+    for build_dir in build_dirs:
+        try:
+            rmtree(build_dir)
+        except FileNotFoundError:
+            logger.info(f"Nothing to do: {build_dir} doesn't exist")
         else:
-            logger.info(f"Deleting {settings.paths.build_dir}")
-            rmtree(settings.paths.build_dir)
+            logger.info(f"Deleted {build_dir}")
@@ -1,10 +1,11 @@
-from pathlib import Path
+from itertools import chain
+from pathlib import Path, PurePath
 from typing import TYPE_CHECKING
 
 from . import app
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Mapping
+    from collections.abc import Iterable
 
     from rich.console import Console
 
@@ -45,52 +46,59 @@ def deps(
     )
 
     if unused:
-        with console.status("Processing decks"):
-            _print_unused_report(sections_analyzer.unused_flavors(), console)
+        _print_unused_report(sections_analyzer.unused_flavors(), console)
 
     if section is not None:
         if unused:
             console.print()
-        with console.status("Processing decks"):
-            _print_section_report(
-                section,
-                flavor,
-                sections_analyzer.parts_using_flavor(section, flavor),
-                console,
-            )
+        _print_section_report(
+            section,
+            flavor,
+            sections_analyzer.parts_using_flavor(section, flavor),
+            console,
+        )
 
 
 def _print_unused_report(
-    unused_flavors: "Mapping[UnresolvedPath, Iterable[str]]", console: "Console"
+    unused_flavors: "Iterable[tuple[UnresolvedPath, Iterable[str]]]",
+    console: "Console",
 ) -> None:
-    from rich.padding import Padding
-    from rich.table import Table
-
     console.rule("[bold]Unused flavors", align="left")
     console.print()
-    if unused_flavors:
-        content = Table("Section", "Flavors")
-        for path, flavors in unused_flavors.items():
-            content.add_row(str(path), " ".join(sorted(flavors)))
-    console.print(Padding(content if unused_flavors else "None.", (0, 0, 0, 2)))
+    _print_rows(("Section", "Flavors"), unused_flavors, console)
 
 
 def _print_section_report(
     section: str,
     flavor: str | None,
-    using: "Mapping[Path, Iterable[str]]",
+    using: "Iterable[tuple[Path, Iterable[str]]]",
     console: "Console",
 ) -> None:
-    from rich.padding import Padding
-    from rich.table import Table
-
     title = section
     if flavor is not None:
         title += f" {flavor}"
     console.rule(f"[bold]Decks depending on [italic]{title}", align="left")
     console.print()
-    if using:
-        content = Table("Deck", "Parts")
-        for deck, part_names in using.items():
-            content.add_row(str(deck), " ".join(sorted(part_names)))
-    console.print(Padding(content if using else "None.", (0, 0, 0, 2)))
+    _print_rows(("Deck", "Parts"), using, console)
+
+
+def _print_rows(
+    headers: tuple[str, str],
+    rows: "Iterable[tuple[PurePath, Iterable[str]]]",
+    console: "Console",
+) -> None:
+    from rich.live import Live
+    from rich.padding import Padding
+    from rich.table import Table
+
+    rows_iterator = iter(rows)
+    with console.status("Processing decks"):
+        first_row = next(rows_iterator, None)
+    if first_row is None:
+        console.print(Padding("None.", (0, 0, 0, 2)))
+        return
+    table = Table(*headers)
+    with Live(Padding(table, (0, 0, 0, 2)), console=console, transient=True):
+        for path, names in chain([first_row], rows_iterator):
+            table.add_row(str(path), " ".join(names))
+    console.print(Padding(table, (0, 0, 0, 2)))
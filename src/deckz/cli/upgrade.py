@@ -18,27 +18,41 @@ def upgrade(*, workdir: Path = Path()) -> None:
     from rich.console import Console
 
     from ..configuring.settings import GlobalSettings
+    from ..utils import find_files
 
     console = Console(file=stderr)
     old_settings = Path("settings.yml")
-    if old_settings.exists():
-        move(old_settings, "deckz.yml")
+    new_settings = Path("deckz.yml")
+    if old_settings.exists() and not new_settings.exists():
+        move(old_settings, new_settings)
 
     settings = GlobalSettings.from_yaml(workdir)
 
     console.print("Renaming files (config -> variables, targets -> deck)")
 
+    old_names = ("global-variables.yml", "company-variables.yml", "deck-variables.yml")
+    user_variables = settings.paths.user_config_dir / "user-variables.yml"
+    # Files found by the walk are known to exist, only the user one needs a check
     for old_path in chain(
-        settings.paths.git_dir.rglob("global-variables.yml"),
-        settings.paths.git_dir.rglob("company-variables.yml"),
-        settings.paths.git_dir.rglob("deck-variables.yml"),
-        (settings.paths.user_config_dir / "user-variables.yml",),
+        # Keep the order of the separate lookups in case a directory has several
+        sorted(
+            find_files(settings.paths.git_dir, *old_names),
+            key=lambda path: old_names.index(path.name),
+        ),
+        (user_variables,) if user_variables.is_file() else (),
     ):
         new_path = old_path.parent / "variables.yml"
-        if old_path.exists():
-            move(old_path, new_path)
+        if new_path.exists():
+            # Already migrated: do not overwrite the current file with a legacy one
             console.print(
-                "  :white_check_mark:"
+                "  :warning: "
                 f"{old_path}\n"
-                f"  → [link=file://{new_path}]{new_path}[/link]"
+                f"  → skipped, [link=file://{new_path}]{new_path}[/link] exists"
             )
+            continue
+        move(old_path, new_path)
+        console.print(
+            "  :white_check_mark:"
+            f"{old_path}\n"
+            f"  → [link=file://{new_path}]{new_path}[/link]"
+        )
@@ -1,105 +1,94 @@
-from collections.abc import Iterable, Iterator, MutableMapping, MutableSet
+from collections import defaultdict
+from collections.abc import Iterator
 from functools import cached_property
 from pathlib import Path, PurePath
-from typing import cast
 
 from ..models import (
     Deck,
     File,
-    NodeVisitor,
-    Part,
+    Node,
     ResolvedPath,
     Section,
     UnresolvedPath,
 )
-from ..utils import all_decks, load_yaml
+from ..utils import all_decks, parse_yaml
+from .assets_usage_cache import AssetsUsageCache
 from .protocols import AssetsAnalyzerProtocol, RendererProtocol
 
 
 class AssetsAnalyzer(AssetsAnalyzerProtocol):
     def __init__(
-        self, assets_dir: Path, git_dir: Path, renderer: RendererProtocol
+        self,
+        assets_dir: Path,
+        git_dir: Path,
+        renderer: RendererProtocol,
+        assets_usage_cache_path: Path,
     ) -> None:
         self._assets_dir = assets_dir
         self._git_dir = git_dir
-        self._renderer = renderer
+        self._assets_usage_cache = AssetsUsageCache(assets_usage_cache_path, renderer)
+        self._licensed_images: dict[Path, bool] = {}
 
     def sections_unlicensed_images(self) -> dict[UnresolvedPath, frozenset[Path]]:
-        return {
-            s: frozenset(
-                i for i in self._section_assets(d) if not self._is_image_licensed(i)
+        # Files are often shared between sections: render each one only once
+        unlicensed_images = {
+            d: frozenset(
+                i for i in self._file_assets(d) if not self._is_image_licensed(i)
             )
-            for s, d in self._section_dependencies.items()
+            for d in set[ResolvedPath]().union(*self._section_dependencies.values())
+        }
+        self._assets_usage_cache.save()
+        return {
+            s: frozenset[Path]().union(*(unlicensed_images[d] for d in ds))
+            for s, ds in self._section_dependencies.items()
         }
 
     @cached_property
     def _decks(self) -> dict[Path, Deck]:
         return all_decks(self._git_dir)
 
-    @property
+    @cached_property
     def _section_dependencies(self) -> dict[UnresolvedPath, set[ResolvedPath]]:
-        section_dependencies_processor = _SectionDependenciesNodeVisitor()
-        result: dict[UnresolvedPath, set[ResolvedPath]] = {}
+        section_dependencies_processor = _SectionDependenciesProcessor()
+        result: defaultdict[UnresolvedPath, set[ResolvedPath]] = defaultdict(set)
         for deck in self._decks.values():
             section_dependencies = section_dependencies_processor.process(deck)
             for path, deps in section_dependencies.items():
-                if path not in result:
-                    result[path] = set()
-                result[path].update(deps)
+                result[path] |= deps
         return result
 
-    def _section_assets(self, dependencies: Iterable[Path]) -> Iterator[Path]:
-        for path in dependencies:
-            for asset in self._renderer.render_to_str(path)[1]:
-                yield self._assets_dir / asset
+    def _file_assets(self, path: ResolvedPath) -> Iterator[Path]:
+        for asset in self._assets_usage_cache.assets(path):
+            yield self._assets_dir / asset
 
     def _is_image_licensed(self, path: Path) -> bool:
-        metadata_path = path.with_suffix(".yml")
-        if not metadata_path.exists():
-            return False
-        return "license" in load_yaml(metadata_path)
+        # Images are often shared between sections: look each one up only once
+        if path not in self._licensed_images:
+            metadata_path = path.with_suffix(".yml")
+            try:
+                content = metadata_path.read_bytes()
+            except FileNotFoundError:
+                licensed = False
+            else:
+                # A plain byte scan rules out most unlicensed images without parsing
+                licensed = b"license" in content and "license" in parse_yaml(content)
+            self._licensed_images[path] = licensed
+        return self._licensed_images[path]
 
 
-class _SectionDependenciesNodeVisitor(
-    NodeVisitor[
-        [MutableMapping[UnresolvedPath, MutableSet[ResolvedPath]], UnresolvedPath], None
-    ]
-):
+class _SectionDependenciesProcessor:
     def process(self, deck: Deck) -> dict[UnresolvedPath, set[ResolvedPath]]:
-        dependencies: dict[UnresolvedPath, set[ResolvedPath]] = {}
-        for part in deck.parts.values():
-            self._process_part(
-                part,
-                cast(
-                    "MutableMapping[UnresolvedPath, MutableSet[ResolvedPath]]",
-                    dependencies,
-                ),
-            )
+        dependencies: defaultdict[UnresolvedPath, set[ResolvedPath]] = defaultdict(set)
+        # Iterative traversal, without a double dispatch per node like a visitor
+        stack: list[tuple[Node, UnresolvedPath]] = [
+            (node, UnresolvedPath(PurePath()))
+            for part in deck.parts.values()
+            for node in part.nodes
+        ]
+        while stack:
+            node, base_unresolved_path = stack.pop()
+            if isinstance(node, File):
+                dependencies[base_unresolved_path].add(node.resolved_path)
+            elif isinstance(node, Section):
+                stack.extend((child, node.unresolved_path) for child in node.nodes)
         return dependencies
-
-    def _process_part(
-        self,
-        part: Part,
-        dependencies: MutableMapping[UnresolvedPath, MutableSet[ResolvedPath]],
-    ) -> None:
-        for node in part.nodes:
-            node.accept(self, dependencies, UnresolvedPath(PurePath()))
-
-    def visit_file(
-        self,
-        file: File,
-        section_dependencies: MutableMapping[UnresolvedPath, MutableSet[ResolvedPath]],
-        base_unresolved_path: UnresolvedPath,
-    ) -> None:
-        if base_unresolved_path not in section_dependencies:
-            section_dependencies[base_unresolved_path] = set()
-        section_dependencies[base_unresolved_path].add(file.resolved_path)
-
-    def visit_section(
-        self,
-        section: Section,
-        section_dependencies: MutableMapping[UnresolvedPath, MutableSet[ResolvedPath]],
-        base_unresolved_path: UnresolvedPath,
-    ) -> None:
-        for node in section.nodes:
-            node.accept(self, section_dependencies, section.unresolved_path)
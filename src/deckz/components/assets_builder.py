@@ -1,25 +1,34 @@
 import sys
 from abc import abstractmethod
 from collections.abc import Callable, Iterable
-from contextlib import redirect_stdout
+from contextlib import redirect_stdout, suppress
 from dataclasses import dataclass
-from itertools import chain
+from functools import cache, partial
+from io import StringIO
 from logging import getLogger
-from multiprocessing import Pool
+from multiprocessing import cpu_count
+from os import getpid, scandir, stat_result
 from pathlib import Path
-from shutil import copyfile
-from tempfile import TemporaryDirectory
-from typing import TYPE_CHECKING, Any, Protocol, override
-
-from plotly.graph_objs import Figure
+from shutil import move
+from typing import TYPE_CHECKING, Any, Protocol
 
 from ..exceptions import DeckzError
-from ..utils import copy_file_if_newer, import_module_and_submodules
+from ..utils import (
+    copy_file_if_newer,
+    find_files,
+    get_pool,
+    import_module_and_submodules,
+    scan_files,
+)
+from .assets_sources_cache import AssetsSourcesCache
 from .protocols import AssetsBuilderProtocol, CompilerProtocol
 
 if TYPE_CHECKING:
+    from plotly.graph_objs import Figure
     from ty_extensions import Intersection
 
+    from .compiler import CompileResult
+
 
 @dataclass(frozen=True)
 class CompilePaths:
@@ -44,12 +53,47 @@ type _CallableWithModuleAndName[**A, T] = Intersection[
 ]
 
 _plt_registry: list[tuple[Path, Path, _CallableWithModuleAndName[[], None]]] = []
-_plotly_registry: list[tuple[Path, Path, _CallableWithModuleAndName[[], Figure]]] = []
-
-
-def _clear_register() -> None:
-    _plt_registry.clear()
-    _plotly_registry.clear()
+_plotly_registry: list[tuple[Path, Path, _CallableWithModuleAndName[[], "Figure"]]] = []
+
+
+# Modification times of the plot modules when their registry was last filled, by
+# package name
+_registry_snapshots: dict[str, dict[str, int]] = {}
+
+
+def _modules_snapshot(package_name: str) -> dict[str, int] | None:
+    module = sys.modules.get(package_name)
+    if module is None:
+        return None
+    paths = [Path(p) for p in getattr(module, "__path__", [])]
+    files = [f for p in paths for f in find_files(p, "*.py")] if paths else []
+    if module.__file__ is not None:
+        files.append(Path(module.__file__))
+    snapshot = {}
+    for f in files:
+        with suppress(FileNotFoundError):
+            snapshot[str(f)] = f.stat().st_mtime_ns
+    return snapshot
+
+
+def _build_registered(
+    build_pdf: Callable[[Path, Callable[[], Any]], None],
+    package_name: str,
+    snapshot: dict[str, int] | None,
+    module_name: str,
+    function_name: str,
+    output_path: Path,
+) -> None:
+    # Pool workers outlive a build: import the plot modules again when the ones they
+    # hold are not the ones the parent registered the functions from
+    if _registry_snapshots.get(package_name) != snapshot:
+        sys.dont_write_bytecode = True
+        # Workers never read the registries, only keep them from growing on reimports
+        _plt_registry.clear()
+        _plotly_registry.clear()
+        import_module_and_submodules(package_name)
+        _registry_snapshots[package_name] = snapshot or {}
+    build_pdf(output_path, getattr(sys.modules[module_name], function_name))
 
 
 class _HasModuleAndName(Protocol):
@@ -59,12 +103,19 @@ class _HasModuleAndName(Protocol):
 
 
 def _build_plot_path(f: _HasModuleAndName) -> tuple[Path, Path]:
-    _, *submodules, _ = f.__module__.split(".")
-    name = f.__name__.replace("_", "-")
+    return _plot_paths(f.__module__, f.__name__)
+
+
+# Plot modules are reloaded on every build, registering the same functions again
+@cache
+def _plot_paths(module_name: str, function_name: str) -> tuple[Path, Path]:
+    _, _, submodules = module_name.partition(".")
+    submodules, _, _ = submodules.rpartition(".")
+    name = function_name.replace("_", "-")
     output_path = (
-        Path("/".join(s.replace("_", "-") for s in submodules)) / name
+        Path(submodules.replace("_", "-").replace(".", "/")) / name
     ).with_suffix(".pdf")
-    python_path_str = sys.modules[f.__module__].__file__
+    python_path_str = sys.modules[module_name].__file__
     # I don't get why this is needed for mypy. It seems from the definition of
     # ModuleType that __file__ is always a str and never None
     assert python_path_str is not None
@@ -99,28 +150,41 @@ class FunctionAssetsBuilder[T](AssetsBuilderProtocol):
         module_name: str,
         library_name: str,
         registry: list[tuple[Path, Path, _CallableWithModuleAndName[[], T]]],
+        sources_cache: AssetsSourcesCache,
     ):
         self._output_dir = output_dir
         self._module_name = module_name
         self._library_name = library_name
         self._registry = registry
+        self._sources_cache = sources_cache
         self._logger = getLogger(__name__)
 
     def build_assets(self) -> None:
-        self._prepare_build()
-
-        sys.dont_write_bytecode = True
-        _clear_register()
-        try:
-            import_module_and_submodules(self._module_name)
-        except ModuleNotFoundError:
-            self._logger.warning(
-                "Could not find %s module, will not produce %s plots.",
-                self._module_name,
-                self._library_name,
-            )
+        # Importing the plot modules again is only needed if one of them changed
+        snapshot = _modules_snapshot(self._module_name)
+        if snapshot is None or snapshot != _registry_snapshots.get(self._module_name):
+            sys.dont_write_bytecode = True
+            self._registry.clear()
+            try:
+                import_module_and_submodules(self._module_name)
+            except ModuleNotFoundError:
+                self._logger.warning(
+                    "Could not find %s module, will not produce %s plots.",
+                    self._module_name,
+                    self._library_name,
+                )
+            else:
+                _registry_snapshots[self._module_name] = (
+                    _modules_snapshot(self._module_name) or {}
+                )
         full_items = [(self._output_dir / o, p, f) for o, p, f in self._registry]
-        to_build = [(o, f) for o, p, f in full_items if self._needs_compile(p, o)]
+        # Plots defined in the same module share their source modification time
+        source_mtimes: dict[Path, int] = {}
+        to_build = [
+            (o, p, f)
+            for o, p, f in full_items
+            if self._needs_compile(p, o, source_mtimes)
+        ]
         if not to_build:
             return
 
@@ -130,41 +194,58 @@ class FunctionAssetsBuilder[T](AssetsBuilderProtocol):
             self._library_name,
         )
 
-        for output_path, function in to_build:
-            self._build_pdf(output_path, function)
-
-    def _prepare_build(self) -> None:
-        pass
+        # Only names are sent to the workers, they import the plot modules themselves
+        get_pool().starmap(
+            partial(
+                _build_registered,
+                self._build_pdf,
+                self._module_name,
+                _registry_snapshots.get(self._module_name),
+            ),
+            ((f.__module__, f.__name__, o) for o, _, f in to_build),
+        )
+        for python_path in {p for _, p, _ in to_build}:
+            self._sources_cache.record(python_path)
+        self._sources_cache.save()
 
+    # Static so that workers receive it by name rather than a pickled builder
+    @staticmethod
     @abstractmethod
-    def _build_pdf(self, output_path: Path, function: Callable[[], T]) -> None:
+    def _build_pdf(output_path: Path, function: Callable[[], T]) -> None:
         raise NotImplementedError
 
-    def _needs_compile(self, python_path: Path, output_path: Path) -> bool:
-        return (
-            not output_path.exists()
-            or output_path.stat().st_mtime_ns < python_path.stat().st_mtime_ns
+    def _needs_compile(
+        self, python_path: Path, output_path: Path, source_mtimes: dict[Path, int]
+    ) -> bool:
+        try:
+            output_stat = output_path.stat()
+        except FileNotFoundError:
+            return True
+        if python_path not in source_mtimes:
+            source_mtimes[python_path] = python_path.stat().st_mtime_ns
+        source_mtime = source_mtimes[python_path]
+        return output_stat.st_mtime_ns < source_mtime and (
+            not self._sources_cache.unchanged(python_path)
         )
 
 
 class PltAssetsBuilder(FunctionAssetsBuilder[None]):
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, sources_cache: AssetsSourcesCache):
         super().__init__(
             output_dir=output_dir,
             module_name="plots",
             library_name="matplotlib",
             registry=_plt_registry,
+            sources_cache=sources_cache,
         )
 
-    @override
-    def _prepare_build(self) -> None:
+    @staticmethod
+    def _build_pdf(output_path: Path, function: Callable[[], None]) -> None:
         import matplotlib
+        import matplotlib.pyplot as plt
 
         matplotlib.use("PDF")
 
-    def _build_pdf(self, output_path: Path, function: Callable[[], None]) -> None:
-        import matplotlib.pyplot as plt
-
         output_path.parent.mkdir(parents=True, exist_ok=True)
         function()
 
@@ -172,16 +253,18 @@ class PltAssetsBuilder(FunctionAssetsBuilder[None]):
         plt.close()
 
 
-class PlotlyAssetsBuilder(FunctionAssetsBuilder[Figure]):
-    def __init__(self, output_dir: Path):
+class PlotlyAssetsBuilder(FunctionAssetsBuilder["Figure"]):
+    def __init__(self, output_dir: Path, sources_cache: AssetsSourcesCache):
         super().__init__(
             output_dir=output_dir,
             module_name="pltly",
             library_name="plotly",
             registry=_plotly_registry,
+            sources_cache=sources_cache,
         )
 
-    def _build_pdf(self, output_path: Path, function: Callable[[], Figure]) -> None:
+    @staticmethod
+    def _build_pdf(output_path: Path, function: Callable[[], "Figure"]) -> None:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         fig = function()
         fig.write_image(output_path)
@@ -192,55 +275,62 @@ class TikzAssetsBuilder(AssetsBuilderProtocol):
         self,
         input_dir: Path,
         output_dir: Path,
+        build_dir: Path,
         assets_dir: Path,
         compiler: CompilerProtocol,
+        sources_cache: AssetsSourcesCache,
     ):
         self._input_dir = input_dir
         self._output_dir = output_dir
+        self._build_dir = build_dir
         self._assets_dir = assets_dir
         self._compiler = compiler
+        self._sources_cache = sources_cache
         self._logger = getLogger(__name__)
 
     def build_assets(self) -> None:
-        with TemporaryDirectory() as build_dir:
-            build_path = Path(build_dir)
-            items = [
-                (input_path, paths)
-                for input_path in chain(
-                    self._input_dir.rglob("*.py"),
-                    self._input_dir.rglob("*.tex"),
-                )
-                if self._needs_compile(
-                    input_path,
-                    paths := self._compute_compile_paths(input_path, build_path),
-                )
-            ]
-
-            if not items:
-                return
-
-            self._logger.info(f"Processing {len(items)} tikz(s) that need recompiling")
-
-            for item in items:
-                self._prepare(*item)
+        items = [
+            (input_path, paths)
+            for entry in scan_files(self._input_dir, "*.py", "*.tex")
+            if self._needs_compile(
+                input_path := Path(entry.path),
+                entry.stat(),
+                paths := self._compute_compile_paths(input_path, self._build_dir),
+            )
+        ]
 
-            with Pool() as pool:
-                results = pool.map(
-                    self._compiler.compile, (item_path.latex for _, item_path in items)
-                )
+        if not items:
+            return
 
-            for (_, paths), result in zip(items, results, strict=True):
-                if result.ok:
-                    paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
-                    copyfile(paths.build_pdf, paths.output_pdf)
-                    paths.output_log.unlink(missing_ok=True)
-                elif paths.build_log.exists():
-                    paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
-                    copyfile(paths.build_log, paths.output_log)
+        self._logger.info(f"Processing {len(items)} tikz(s) that need recompiling")
+
+        self._link_dirs({paths.latex.parent for _, paths in items})
+        for input_path, paths in items:
+            self._prepare(input_path, paths)
+
+        # Move each PDF out as soon as it is compiled, while the others still run. The
+        # auxiliary files stay in the build directory for the next compilations
+        compile_item = partial(_compile_indexed, self._compiler)
+        chunksize = max(1, len(items) // (4 * cpu_count()))
+        results: dict[int, CompileResult] = {}
+        for i, result in get_pool().imap_unordered(
+            compile_item, enumerate(paths.latex for _, paths in items), chunksize
+        ):
+            results[i] = result
+            input_path, paths = items[i]
+            if result.ok:
+                paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
+                move(paths.build_pdf, paths.output_pdf)
+                paths.output_log.unlink(missing_ok=True)
+                self._sources_cache.record(input_path)
+            elif paths.build_log.exists():
+                paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
+                move(paths.build_log, paths.output_log)
+        self._sources_cache.save()
 
         failed = []
-        for (input_path, paths), result in zip(items, results, strict=True):
-            if not result.ok:
+        for i, (input_path, paths) in enumerate(items):
+            if not (result := results[i]).ok:
                 failed.append((input_path, paths.output_log))
                 self._logger.warning("Standalone compilation of %s errored", input_path)
                 self._logger.warning("Captured stderr\n%s", result.stderr)
@@ -263,10 +353,15 @@ class TikzAssetsBuilder(AssetsBuilderProtocol):
             )
             raise DeckzError(msg)
 
-    def _needs_compile(self, input_file: Path, compile_paths: CompilePaths) -> bool:
-        return (
-            not compile_paths.output_pdf.exists()
-            or compile_paths.output_pdf.stat().st_mtime < input_file.stat().st_mtime
+    def _needs_compile(
+        self, input_file: Path, input_stat: stat_result, compile_paths: CompilePaths
+    ) -> bool:
+        try:
+            output_stat = compile_paths.output_pdf.stat()
+        except FileNotFoundError:
+            return True
+        return output_stat.st_mtime_ns < input_stat.st_mtime_ns and (
+            not self._sources_cache.unchanged(input_file)
         )
 
     def _generate_latex(self, python_file: Path, output_file: Path) -> None:
@@ -275,37 +370,38 @@ class TikzAssetsBuilder(AssetsBuilderProtocol):
             filename=python_file.name,
             mode="exec",
         )
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with output_file.open("w", encoding="utf8") as fh, redirect_stdout(fh):
+        # Buffer the generated LaTeX to write it at once, and only if the script ran
+        buffer = StringIO()
+        with redirect_stdout(buffer):
             exec(compiled)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(buffer.getvalue(), encoding="utf8")
 
     def _compute_compile_paths(self, input_file: Path, build_dir: Path) -> CompilePaths:
-        latex = (build_dir / input_file.relative_to(self._input_dir)).with_suffix(
-            ".tex"
-        )
-        build_pdf = latex.with_suffix(".pdf")
-        output_pdf = (
-            self._output_dir / input_file.relative_to(self._input_dir)
-        ).with_suffix(".pdf")
-        build_log = latex.with_suffix(".log")
-        output_log = output_pdf.with_suffix(".log")
+        # Sources are matched on their .py or .tex suffix: strip it with string
+        # operations rather than building an intermediate path for each suffix
+        relative = str(input_file.relative_to(self._input_dir))
+        stem = relative[: relative.rindex(".")]
+        build_base = f"{build_dir}/{stem}"
+        output_base = f"{self._output_dir}/{stem}"
         return CompilePaths(
-            latex=latex,
-            build_pdf=build_pdf,
-            output_pdf=output_pdf,
-            build_log=build_log,
-            output_log=output_log,
+            latex=Path(f"{build_base}.tex"),
+            build_pdf=Path(f"{build_base}.pdf"),
+            output_pdf=Path(f"{output_base}.pdf"),
+            build_log=Path(f"{build_base}.log"),
+            output_log=Path(f"{output_base}.log"),
         )
 
-    def _prepare(self, input_file: Path, compile_paths: CompilePaths) -> None:
-        build_dir = compile_paths.latex.parent
-        build_dir.mkdir(parents=True, exist_ok=True)
-        dirs_to_link = [d for d in self._assets_dir.iterdir() if d.is_dir()]
-        for d in dirs_to_link:
-            build_d = build_dir / d.name
-            if not build_d.exists():
-                build_d.symlink_to(d)
+    def _link_dirs(self, build_dirs: Iterable[Path]) -> None:
+        # The same asset directories are linked once in every item build directory
+        with scandir(self._assets_dir) as entries:
+            dirs_to_link = [Path(e.path) for e in entries if e.is_dir()]
+        for build_dir in build_dirs:
+            build_dir.mkdir(parents=True, exist_ok=True)
+            for d in dirs_to_link:
+                _link_dir(build_dir / d.name, d)
 
+    def _prepare(self, input_file: Path, compile_paths: CompilePaths) -> None:
         if input_file.suffix == ".py":
             self._generate_latex(input_file, compile_paths.latex)
         elif input_file.suffix == ".tex":
@@ -313,3 +409,24 @@ class TikzAssetsBuilder(AssetsBuilderProtocol):
         else:
             msg = f"unsupported standalone file extension {input_file.suffix}"
             raise ValueError(msg)
+
+
+def _link_dir(link: Path, target: Path) -> None:
+    try:
+        link.symlink_to(target)
+    except FileExistsError:
+        # The build directory persists across runs: links from before the repository
+        # or its shared directory moved must be replaced
+        if link.is_symlink() and link.readlink() == target:
+            return
+        temporary = link.with_name(f".{link.name}.{getpid()}")
+        temporary.unlink(missing_ok=True)
+        temporary.symlink_to(target)
+        temporary.replace(link)
+
+
+def _compile_indexed(
+    compiler: CompilerProtocol, item: tuple[int, Path]
+) -> tuple[int, "CompileResult"]:
+    i, latex = item
+    return i, compiler.compile(latex)
@@ -10,14 +10,23 @@ class AssetsMetadataRetriever(AssetsMetadataRetrieverProtocol):
     def __init__(self, assets_dir: Path) -> None:
         self._assets_metadata: AssetsMetadata = {}
         self._assets_dir = assets_dir
+        self._metadata_cache: dict[str, dict[str, Any] | None] = {}
 
     @property
     def assets_metadata(self) -> AssetsMetadata:
         return self._assets_metadata
 
     def __call__(self, value: str) -> dict[str, Any] | None:
-        metadata_path = (self._assets_dir / Path(value)).with_suffix(".yml")
-        metadata = load_yaml(metadata_path) if metadata_path.exists() else None
+        # The same image is usually used several times in a rendered file
+        if value in self._metadata_cache:
+            metadata = self._metadata_cache[value]
+        else:
+            metadata_path = (self._assets_dir / Path(value)).with_suffix(".yml")
+            try:
+                metadata = load_yaml(metadata_path)
+            except FileNotFoundError:
+                metadata = None
+            self._metadata_cache[value] = metadata
         self.assets_metadata[value] = (
             *self.assets_metadata.setdefault(value, ()),
             metadata,
@@ -1,8 +1,9 @@
-from functools import partial, reduce
-from multiprocessing import Pool
+from collections.abc import Iterator
+from functools import partial
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
-from ..models import Deck, ResolvedPath
+from ..models import ResolvedPath
 from ..utils import all_decks
 from .deck_builder import PartDependenciesNodeVisitor
 from .protocols import AssetsSearcherProtocol, RendererProtocol
@@ -16,21 +17,35 @@ class AssetsSearcher(AssetsSearcherProtocol):
         self._git_dir = git_dir
         self._renderer = renderer
 
-    def search(self, asset: str) -> set[ResolvedPath]:
-        f = partial(self._deck_asset_dependencies, asset=asset)
-        with Pool() as pool:
-            return reduce(
-                set.union,
-                pool.map(f, all_decks(self._git_dir).values()),
-                set(),
-            )
-
-    def _deck_asset_dependencies(self, deck: Deck, asset: str) -> set[ResolvedPath]:
-        result = set()
-        deps = PartDependenciesNodeVisitor().process(deck)
-        for part_deps in deps.values():
-            for part_dep in part_deps:
-                _, assets_usage = self._renderer.render_to_str(part_dep)
-                if asset in assets_usage:
-                    result.add(part_dep)
-        return result
+    def search(self, asset: str) -> Iterator[ResolvedPath]:
+        # Shared files are usually included by many decks: render each one only once
+        dependencies = self._dependencies()
+        f = partial(_using_asset, asset=asset)
+        chunksize = max(1, len(dependencies) // (4 * cpu_count()))
+        with Pool(initializer=_init_worker, initargs=(self._renderer,)) as pool:
+            for path in pool.imap_unordered(f, dependencies, chunksize):
+                if path is not None:
+                    yield path
+
+    def _dependencies(self) -> set[ResolvedPath]:
+        dependencies_processor = PartDependenciesNodeVisitor()
+        dependencies: set[ResolvedPath] = set()
+        for deck in all_decks(self._git_dir).values():
+            for part_dependencies in dependencies_processor.process(deck).values():
+                dependencies.update(part_dependencies)
+        return dependencies
+
+
+# Set once per pool worker so that the renderer is not pickled along with each task
+_worker_renderer: RendererProtocol | None = None
+
+
+def _init_worker(renderer: RendererProtocol) -> None:
+    global _worker_renderer
+    _worker_renderer = renderer
+
+
+def _using_asset(path: ResolvedPath, asset: str) -> ResolvedPath | None:
+    assert _worker_renderer is not None
+    _, assets_usage = _worker_renderer.render_to_str(path)
+    return path if asset in assets_usage else None
@@ -0,0 +1,34 @@
+from hashlib import file_digest
+from pathlib import Path
+
+from .json_cache import JsonCache
+
+
+class AssetsSourcesCache(JsonCache[list[int | str]]):
+    """Remember the content of the sources of the last successful asset builds.
+
+    Sources get touched without being modified (checkouts, editors saving unchanged \
+    files, etc). Comparing their content to the one of the last build avoids \
+    rebuilding the corresponding assets in those cases.
+    """
+
+    def unchanged(self, source: Path) -> bool:
+        """Check whether `source` has the content it had when it was last recorded.
+
+        Args:
+            source: Path of the source to check.
+
+        Returns:
+            True if the source was recorded and did not change since, False otherwise.
+        """
+        entry = self._entries.get(str(source))
+        if entry is None or entry[0] != source.stat().st_size:
+            return False
+        return entry[1] == self._digest(source)
+
+    def record(self, source: Path) -> None:
+        self._update(source, [source.stat().st_size, self._digest(source)])
+
+    def _digest(self, source: Path) -> str:
+        with source.open("rb") as fh:
+            return file_digest(fh, "sha256").hexdigest()
@@ -0,0 +1,28 @@
+from pathlib import Path
+from typing import Any
+
+from ..models import ResolvedPath
+from .json_cache import JsonCache
+from .protocols import RendererProtocol
+
+
+class AssetsUsageCache(JsonCache[list[Any]]):
+    """Remember the assets used by files to avoid rendering them again.
+
+    Entries are persisted between runs, keyed by the path of the rendered file and \
+    validated by its modification time and size. Templates included by a file are not \
+    tracked.
+    """
+
+    def __init__(self, cache_path: Path, renderer: RendererProtocol) -> None:
+        super().__init__(cache_path)
+        self._renderer = renderer
+
+    def assets(self, path: ResolvedPath) -> list[str]:
+        stat = path.stat()
+        entry = self._entries.get(str(path))
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return entry[2]
+        assets = list(self._renderer.render_to_str(path)[1])
+        self._update(path, [stat.st_mtime_ns, stat.st_size, assets])
+        return assets
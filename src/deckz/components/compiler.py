@@ -1,14 +1,26 @@
 from collections.abc import Iterable
 from pathlib import Path
+from shutil import which
 from subprocess import run
 
 from ..models import CompileResult
 from .protocols import CompilerProtocol
 
+_SUCCESS_OUTPUT_SIZE = 64 * 1024
+
 
 class Compiler(CompilerProtocol):
     def __init__(self, build_command: Iterable[str]) -> None:
-        self._build_command = build_command
+        executable, *arguments = build_command
+        # Look the executable up once instead of on every compilation. Commands given
+        # as paths are left alone since they are relative to the compiled file
+        if "/" not in executable and (resolved := which(executable)) is not None:
+            executable = str(Path(resolved).absolute())
+        self._build_command = (executable, *arguments)
+
+    @property
+    def fingerprint(self) -> str:
+        return repr(self._build_command)
 
     def compile(self, file: Path) -> CompileResult:
         completed_process = run(
@@ -17,8 +29,13 @@ class Compiler(CompilerProtocol):
             capture_output=True,
             encoding="utf8",
         )
-        return CompileResult(
-            completed_process.returncode == 0,
-            completed_process.stdout,
-            completed_process.stderr,
-        )
+        ok = completed_process.returncode == 0
+        # Outputs are sent back from pool workers and only read on errors: keep all of
+        # them for failures but only their end for successes
+        if ok:
+            return CompileResult(
+                ok,
+                completed_process.stdout[-_SUCCESS_OUTPUT_SIZE:],
+                completed_process.stderr[-_SUCCESS_OUTPUT_SIZE:],
+            )
+        return CompileResult(ok, completed_process.stdout, completed_process.stderr)
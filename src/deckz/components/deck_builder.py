@@ -1,16 +1,28 @@
-from collections.abc import Iterable, MutableSequence, MutableSet, Sequence, Set
+from collections.abc import (
+    Callable,
+    Iterable,
+    MutableSequence,
+    MutableSet,
+    Sequence,
+    Set,
+)
+from contextlib import suppress
 from dataclasses import dataclass
 from enum import Enum
+from functools import partial
 from logging import getLogger
-from multiprocessing import Pool, cpu_count
-from pathlib import Path, PurePosixPath
+from os import getpid, scandir, sep, stat_result
+from pathlib import Path
+from re import compile as re_compile
 from shutil import copyfile
-from typing import Any
+from stat import S_ISLNK
+from typing import TYPE_CHECKING, Any
 
 from ..exceptions import DeckzError
 from ..models import (
     Deck,
     File,
+    Node,
     NodeVisitor,
     Part,
     PartName,
@@ -20,10 +32,13 @@ from ..models import (
     Title,
     TitleOrContent,
 )
-from ..utils import copy_file_if_newer
+from ..utils import copy_file_if_newer, get_pool, scan_files
 from .compiler import CompileResult
 from .protocols import CompilerProtocol, DeckBuilderProtocol, RendererProtocol
 
+if TYPE_CHECKING:
+    from hashlib import blake2b
+
 
 class CompileType(Enum):
     Handout = "handout"
@@ -31,12 +46,25 @@ class CompileType(Enum):
     PrintHandout = "print-handout"
 
 
-@dataclass(frozen=True)
+_HANDOUT = {
+    CompileType.Handout: True,
+    CompileType.Presentation: False,
+    CompileType.PrintHandout: True,
+}
+_PRINT = {
+    CompileType.Handout: False,
+    CompileType.Presentation: False,
+    CompileType.PrintHandout: True,
+}
+
+
+@dataclass(frozen=True, slots=True)
 class CompileItem:
     parts: Sequence[PartSlides]
     dependencies: Set[Path]
     compile_type: CompileType
     toc: bool
+    build_name: str
 
 
 class DeckBuilder(DeckBuilderProtocol):
@@ -59,75 +87,199 @@ class DeckBuilder(DeckBuilderProtocol):
         self._build_presentation = build_presentation
         self._build_handout = build_handout
         self._build_print = build_print
-        self._deck_name = deck.name
-        self._parts_slides = _SlidesNodeVisitor(basedirs).process(deck)
-        self._dependencies = PartDependenciesNodeVisitor().process(deck)
+        # Compile item and build directory names are lower case
+        self._deck_name = deck.name.lower()
+        parts = _PartsNodeVisitor(basedirs).process(deck)
+        self._parts_slides = {name: slides for name, (slides, _) in parts.items()}
+        self._dependencies = {name: deps for name, (_, deps) in parts.items()}
         self._output_dir = output_dir
         self._build_dir = build_dir
         self._dirs_to_link = dirs_to_link
         self._template = template
-        self._basedirs = basedirs
+        self._basedir_prefixes = _basedir_prefixes(basedirs)
         self._compiler = compiler
         self._renderer = renderer
         self._logger = getLogger(__name__)
 
     def build_deck(self) -> bool:
         items = self._list_items()
-        self._logger.info(f"Building {len(items)} PDFs.")
-        with Pool(min(cpu_count(), len(items))) as pool:
-            results = pool.starmap(self._build_item, items.items())
-        for item_name, result in zip(items, results, strict=True):
+        shared_fingerprint = self._shared_fingerprint()
+        fingerprints = self._fingerprints(shared_fingerprint, items)
+        to_build = {
+            name: item
+            for name, item in items.items()
+            if not self._up_to_date(name, item, fingerprints[name])
+        }
+        if not to_build:
+            self._logger.info("All PDFs are up to date.")
+            return True
+        self._logger.info(f"Building {len(to_build)} PDFs.")
+        # Items with the same dependencies share a build directory: prepare each one
+        # once before compiling
+        build_dirs = {item.build_name: item.dependencies for item in to_build.values()}
+        get_pool().map(
+            partial(self._prepare_build_dir, shared_fingerprint.hexdigest()),
+            build_dirs.items(),
+        )
+        self._prune_render_cache()
+        shared_pdfs = self._render_items(to_build)
+        # Start the biggest items first so that they do not end up as stragglers
+        ordered = sorted(
+            ((name, to_build[name]) for name in shared_pdfs),
+            key=lambda i: _build_cost(i[1]),
+            reverse=True,
+        )
+        ok = True
+        # Report each compilation as soon as it finishes rather than after the slowest
+        for item_name, result in get_pool().imap_unordered(
+            self._build_named_item, ordered
+        ):
             if not result.ok:
+                ok = False
                 self._logger.warning("Compilation %s errored", item_name)
                 self._logger.warning("Captured %s stderr\n%s", item_name, result.stderr)
                 self._logger.warning("Captured %s stdout\n%s", item_name, result.stdout)
-        return all(result.ok for result in results)
+                continue
+            build_pdf_path = self._latex_path(
+                item_name, to_build[item_name]
+            ).with_suffix(".pdf")
+            for name in shared_pdfs[item_name]:
+                if name != item_name:
+                    _copy_atomically(build_pdf_path, self._output_dir / f"{name}.pdf")
+                self._fingerprint_path(name, to_build[name]).write_text(
+                    fingerprints[name]
+                )
+        return ok
 
     def _name_compile_item(
         self, compile_type: CompileType, name: PartName | None = None
     ) -> str:
         return (
-            f"{self._deck_name}-{name}-{compile_type.value}"
+            f"{self._deck_name}-{name.lower()}-{compile_type.value}"
             if name
             else f"{self._deck_name}-{compile_type.value}"
-        ).lower()
+        )
 
     def _list_items(self) -> dict[str, CompileItem]:
         to_compile = {}
         all_slides = list(self._parts_slides.values())
         all_dependencies = frozenset().union(*self._dependencies.values())
+        deck_build_name = self._deck_name
         if self._build_handout:
             to_compile[self._name_compile_item(CompileType.Handout)] = CompileItem(
-                all_slides, all_dependencies, CompileType.Handout, True
+                all_slides, all_dependencies, CompileType.Handout, True, deck_build_name
             )
         if self._build_print:
             to_compile[self._name_compile_item(CompileType.PrintHandout)] = CompileItem(
-                all_slides, all_dependencies, CompileType.Handout, True
+                all_slides,
+                all_dependencies,
+                CompileType.PrintHandout,
+                True,
+                deck_build_name,
             )
         for name, slides in self._parts_slides.items():
             dependencies = self._dependencies[name]
+            part_build_name = f"{self._deck_name}-{name.lower()}"
             if self._build_presentation:
                 to_compile[self._name_compile_item(CompileType.Presentation, name)] = (
-                    CompileItem([slides], dependencies, CompileType.Presentation, False)
+                    CompileItem(
+                        [slides],
+                        dependencies,
+                        CompileType.Presentation,
+                        False,
+                        part_build_name,
+                    )
                 )
             if self._build_handout:
                 to_compile[self._name_compile_item(CompileType.Handout, name)] = (
-                    CompileItem([slides], dependencies, CompileType.Handout, False)
+                    CompileItem(
+                        [slides],
+                        dependencies,
+                        CompileType.Handout,
+                        False,
+                        part_build_name,
+                    )
                 )
         return to_compile
 
+    def _shared_fingerprint(self) -> "blake2b":
+        from hashlib import blake2b
+
+        # Templates, linked assets, variables, the renderer configuration and the build
+        # command are shared by all the items. Variables are plain yaml values, their
+        # repr cannot fail on keys of mixed types like sorting them would
+        shared = blake2b(repr(self._variables).encode())
+        shared.update(self._renderer.fingerprint.encode())
+        shared.update(self._compiler.fingerprint.encode())
+        # Linked assets are only known once the items are rendered: stat all of them,
+        # a scandir walk is cheap next to a compilation
+        for directory in (self._template.parent, *self._dirs_to_link):
+            for entry in sorted(scan_files(directory, "*"), key=lambda e: e.path):
+                with suppress(FileNotFoundError):  # Dangling symbolic link
+                    _update_fingerprint(shared, entry.path, entry.stat())
+        return shared
+
+    def _fingerprints(
+        self, shared: "blake2b", items: dict[str, CompileItem]
+    ) -> dict[str, str]:
+        fingerprints = {}
+        for name, item in items.items():
+            digest = shared.copy()
+            digest.update(repr((item.parts, item.compile_type, item.toc)).encode())
+            for dependency in sorted(item.dependencies):
+                with suppress(FileNotFoundError):
+                    _update_fingerprint(digest, str(dependency), dependency.stat())
+            fingerprints[name] = digest.hexdigest()
+        return fingerprints
+
+    def _fingerprint_path(self, name: str, item: CompileItem) -> Path:
+        return self._build_dir / item.build_name / f"{name}.fingerprint"
+
+    def _up_to_date(self, name: str, item: CompileItem, fingerprint: str) -> bool:
+        try:
+            previous = self._fingerprint_path(name, item).read_text()
+        except FileNotFoundError:
+            return False
+        return previous == fingerprint and (self._output_dir / f"{name}.pdf").exists()
+
+    def _build_named_item(
+        self, named_item: tuple[str, CompileItem]
+    ) -> tuple[str, CompileResult]:
+        name, item = named_item
+        return name, self._build_item(name, item)
+
+    def _prepare_build_dir(
+        self, shared_fingerprint: str, build_dir_item: tuple[str, Set[Path]]
+    ) -> None:
+        build_name, dependencies = build_dir_item
+        build_dir = self._setup_build_dir(build_name)
+        copied = self._copy_dependencies(dependencies, build_dir)
+        self._render_dependencies(copied, shared_fingerprint)
+
+    def _render_items(self, items: dict[str, CompileItem]) -> dict[str, list[str]]:
+        from hashlib import blake2b
+
+        # Items rendering to the same LaTeX in the same build directory only need to
+        # be compiled once: map the item to compile to all the items sharing its PDF
+        groups: dict[tuple[str, str], list[str]] = {}
+        for name, item in items.items():
+            latex_path = self._latex_path(name, item)
+            self._render_latex(item, latex_path)
+            digest = blake2b(latex_path.read_bytes()).hexdigest()
+            groups.setdefault((item.build_name, digest), []).append(name)
+        return {names[0]: names for names in groups.values()}
+
+    def _latex_path(self, name: str, item: CompileItem) -> Path:
+        return self._build_dir / item.build_name / f"{name}.tex"
+
     def _build_item(self, name: str, item: CompileItem) -> CompileResult:
-        build_dir = self._setup_build_dir(name)
-        latex_path = build_dir / f"{name}.tex"
+        latex_path = self._latex_path(name, item)
         build_pdf_path = latex_path.with_suffix(".pdf")
         output_pdf_path = self._output_dir / f"{name}.pdf"
-        self._render_latex(item, latex_path)
-        copied = self._copy_dependencies(item.dependencies, build_dir)
-        self._render_dependencies(copied)
         result = self._compiler.compile(latex_path)
         if result.ok:
             self._output_dir.mkdir(parents=True, exist_ok=True)
-            copyfile(build_pdf_path, output_pdf_path)
+            _copy_atomically(build_pdf_path, output_pdf_path)
         return result
 
     def _setup_build_dir(self, name: str) -> Path:
@@ -143,10 +295,9 @@ class DeckBuilder(DeckBuilderProtocol):
             output_path,
             variables=self._variables,
             parts=item.parts,
-            handout=item.compile_type
-            in [CompileType.Handout, CompileType.PrintHandout],
+            handout=_HANDOUT[item.compile_type],
             toc=item.toc,
-            print=item.compile_type is CompileType.PrintHandout,
+            print=_PRINT[item.compile_type],
         )
 
     def _copy_dependencies(
@@ -154,48 +305,159 @@ class DeckBuilder(DeckBuilderProtocol):
     ) -> list[Path]:
         copied = []
         for dependency in dependencies:
-            for basedir in self._basedirs:
-                if dependency.is_relative_to(basedir):
-                    relative_path = dependency.relative_to(basedir)
-                    break
-            else:
+            relative_path = _relative_path(dependency, self._basedir_prefixes)
+            if relative_path is None:
                 raise ValueError
             build_path = (target_build_dir / relative_path).with_suffix(".tex.j2")
+            if self._link_if_plain(dependency, build_path.with_suffix("")):
+                continue
             if copy_file_if_newer(dependency, build_path):
                 copied.append(build_path)
         return copied
 
-    def _render_dependencies(self, to_render: list[Path]) -> None:
+    def _link_if_plain(self, dependency: Path, build_path: Path) -> bool:
+        # Dependencies without any template syntax render to themselves: link them
+        # instead of copying and rendering them
+        try:
+            build_stat = build_path.lstat()
+        except FileNotFoundError:
+            pass
+        else:
+            if (
+                S_ISLNK(build_stat.st_mode)
+                and dependency.stat().st_mtime_ns <= build_stat.st_mtime_ns
+            ):
+                return True
+        if _TEMPLATE_SYNTAX.search(dependency.read_bytes()):
+            return False
+        build_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = build_path.with_name(f".{build_path.name}.{getpid()}")
+        temporary.unlink(missing_ok=True)
+        temporary.symlink_to(dependency)
+        temporary.replace(build_path)
+        return True
+
+    def _render_dependencies(
+        self, to_render: list[Path], shared_fingerprint: str
+    ) -> None:
+        from hashlib import blake2b
+
+        # Build directories sharing a dependency, and unchanged dependencies of
+        # previous builds, reuse its output. Besides its source, the output depends on
+        # what the shared fingerprint covers: variables, renderer configuration and
+        # the linked assets metadata
+        cache_dir = self._build_dir / _RENDER_CACHE
+        cache_dir.mkdir(parents=True, exist_ok=True)
         for item in to_render:
-            self._renderer.render_to_path(item, item.with_suffix(""))
+            output_path = item.with_suffix("")
+            digest = blake2b(shared_fingerprint.encode())
+            digest.update(item.read_bytes())
+            cached = cache_dir / digest.hexdigest()
+            if not cached.exists():
+                self._renderer.render_to_path(item, output_path)
+                _link_atomically(output_path, cached)
+            else:
+                _link_atomically(cached, output_path)
+
+    def _prune_render_cache(self) -> None:
+        # Cached renders are hard linked into the build directories, and replaced
+        # there when they change: entries no build directory links to anymore are
+        # stale
+        with (
+            suppress(FileNotFoundError),
+            scandir(self._build_dir / _RENDER_CACHE) as it,
+        ):
+            for entry in it:
+                if entry.stat(follow_symlinks=False).st_nlink == 1:
+                    Path(entry.path).unlink(missing_ok=True)
 
     def _setup_link(self, source: Path, target: Path) -> None:
-        if not target.exists():
+        try:
+            target = target.resolve(strict=True)
+        except FileNotFoundError:
             msg = (
                 f"{target} could not be found. Please make sure it exists before "
                 "proceeding"
             )
-            raise DeckzError(msg)
-        target = target.resolve()
-        if source.is_symlink():
-            if source.resolve().samefile(target):
+            raise DeckzError(msg) from None
+        try:
+            source_stat = source.lstat()
+        except FileNotFoundError:
+            source.parent.mkdir(parents=True, exist_ok=True)
+            source.symlink_to(target)
+            return
+        if S_ISLNK(source_stat.st_mode):
+            # Links created by previous builds point to the resolved target as is
+            if source.readlink() == target or source.resolve().samefile(target):
                 return
             msg = (
                 f"{source} already exists in the build directory and does not point to "
                 f"{target}. Please clean the build directory"
             )
             raise DeckzError(msg)
-        if source.exists():
-            msg = (
-                f"{source} already exists in the build directory. Please clean the "
-                "build directory"
-            )
-            raise DeckzError(msg)
-        source.parent.mkdir(parents=True, exist_ok=True)
-        source.symlink_to(target)
+        msg = (
+            f"{source} already exists in the build directory. Please clean the "
+            "build directory"
+        )
+        raise DeckzError(msg)
+
+
+def _update_fingerprint(digest: "blake2b", path: str, stat: stat_result) -> None:
+    digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0".encode())
+
+
+_RENDER_CACHE = ".render-cache"
+
+# Delimiters and line prefixes of the Jinja environment of the renderer
+_TEMPLATE_SYNTAX = re_compile(rb"\\BLOCK\{|\\V\{|\\#\{|%%|%#")
+
+
+def _build_cost(item: CompileItem) -> int:
+    return len(item.dependencies) + sum(len(part.sections) for part in item.parts)
+
+
+def _link_atomically(source: Path, destination: Path) -> None:
+    # Rendered files are only ever replaced, never modified in place, so they can be
+    # hard linked
+    temporary = destination.with_name(f".{destination.name}.{getpid()}")
+    temporary.unlink(missing_ok=True)
+    temporary.hardlink_to(source)
+    temporary.replace(destination)
+
+
+def _copy_atomically(source: Path, destination: Path) -> None:
+    # The build PDF is rewritten in place by the next compilation, so it cannot be
+    # hard linked. Copy it next to the destination and rename it over the previous PDF
+    # so that viewers never see a partial file. copyfile uses sendfile on Linux
+    temporary = destination.with_name(f".{destination.name}.{getpid()}")
+    try:
+        copyfile(source, temporary)
+        temporary.replace(destination)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def _basedir_prefixes(basedirs: Iterable[Path]) -> tuple[str, ...]:
+    return tuple(f"{str(basedir).rstrip(sep)}{sep}" for basedir in basedirs)
+
+
+def _relative_path(path: Path, basedir_prefixes: Iterable[str]) -> str | None:
+    # Plain prefix checks on resolved paths, cheaper than Path.is_relative_to
+    path_str = str(path)
+    for prefix in basedir_prefixes:
+        if path_str.startswith(prefix):
+            return path_str[len(prefix) :]
+    return None
 
 
 class PartDependenciesNodeVisitor(NodeVisitor[[MutableSet[ResolvedPath]], None]):
+    def __init__(self) -> None:
+        # Dispatch on the node type directly instead of going through Node.accept
+        self._dispatch: dict[type[Node], Callable[..., None]] = {
+            File: self.visit_file,
+            Section: self.visit_section,
+        }
+
     def process(self, deck: Deck) -> dict[PartName, set[ResolvedPath]]:
         return {
             part_name: self._process_part(part)
@@ -204,8 +466,9 @@ class PartDependenciesNodeVisitor(NodeVisitor[[MutableSet[ResolvedPath]], None])
 
     def _process_part(self, part: Part) -> set[ResolvedPath]:
         dependencies: set[ResolvedPath] = set()
+        dispatch = self._dispatch
         for node in part.nodes:
-            node.accept(self, dependencies)
+            dispatch[type(node)](node, dependencies)
         return dependencies
 
     def visit_file(self, file: File, dependencies: MutableSet[ResolvedPath]) -> None:
@@ -214,46 +477,64 @@ class PartDependenciesNodeVisitor(NodeVisitor[[MutableSet[ResolvedPath]], None])
     def visit_section(
         self, section: Section, dependencies: MutableSet[ResolvedPath]
     ) -> None:
+        dispatch = self._dispatch
         for node in section.nodes:
-            node.accept(self, dependencies)
+            dispatch[type(node)](node, dependencies)
 
 
-class _SlidesNodeVisitor(NodeVisitor[[MutableSequence[TitleOrContent], int], None]):
+class _PartsNodeVisitor(
+    NodeVisitor[[MutableSequence[TitleOrContent], MutableSet[ResolvedPath], int], None]
+):
+    # Collects both the slides and the dependencies of the parts in a single walk
     def __init__(self, basedirs: Iterable[Path]) -> None:
-        self._basedirs = tuple(basedirs)
+        self._basedir_prefixes = _basedir_prefixes(basedirs)
+        self._dispatch: dict[type[Node], Callable[..., None]] = {
+            File: self.visit_file,
+            Section: self.visit_section,
+        }
 
-    def process(self, deck: Deck) -> dict[PartName, PartSlides]:
+    def process(
+        self, deck: Deck
+    ) -> dict[PartName, tuple[PartSlides, set[ResolvedPath]]]:
         return {
             part_name: self._process_part(part)
             for part_name, part in deck.parts.items()
         }
 
-    def _process_part(self, part: Part) -> PartSlides:
+    def _process_part(self, part: Part) -> tuple[PartSlides, set[ResolvedPath]]:
         sections: list[TitleOrContent] = []
+        dependencies: set[ResolvedPath] = set()
+        dispatch = self._dispatch
         for node in part.nodes:
-            node.accept(self, sections, 0)
-        return PartSlides(part.title, sections)
+            dispatch[type(node)](node, sections, dependencies, 0)
+        return PartSlides(part.title, sections), dependencies
 
     def visit_file(
-        self, file: File, sections: MutableSequence[TitleOrContent], level: int
+        self,
+        file: File,
+        sections: MutableSequence[TitleOrContent],
+        dependencies: MutableSet[ResolvedPath],
+        level: int,
     ) -> None:
+        dependencies.add(file.resolved_path)
         if file.title:
             sections.append(Title(file.title, level))
-        for basedir in self._basedirs:
-            if file.resolved_path.is_relative_to(basedir):
-                path = file.resolved_path.relative_to(basedir)
-                break
-        else:
+        path = _relative_path(file.resolved_path, self._basedir_prefixes)
+        if path is None:
             msg = f"could not find file {file}"
             raise ValueError(msg)
-        path = path.with_suffix("")
-        sections.append(str(PurePosixPath(path)))
+        sections.append(Path(path).with_suffix("").as_posix())
 
     def visit_section(
-        self, section: Section, sections: MutableSequence[TitleOrContent], level: int
+        self,
+        section: Section,
+        sections: MutableSequence[TitleOrContent],
+        dependencies: MutableSet[ResolvedPath],
+        level: int,
     ) -> None:
         if section.title:
             sections.append(Title(section.title, level))
             level += 1
+        dispatch = self._dispatch
         for node in section.nodes:
-            node.accept(self, sections, level)
+            dispatch[type(node)](node, sections, dependencies, level)
@@ -21,15 +21,19 @@ if TYPE_CHECKING:
 class GlobalSettingsFactory[T: "GlobalSettings"](GlobalFactoryProtocol):
     def __init__(self, settings: T) -> None:
         self._settings = settings
+        self._renderer: RendererProtocol | None = None
 
     def renderer(self) -> RendererProtocol:
         from .renderer import Renderer
 
-        return Renderer(
-            default_img_values=self._settings.default_img_values,
-            assets_dir=self._settings.paths.shared_dir,
-            global_factory=self,
-        )
+        # The renderer holds the Jinja environment and its template cache: share it
+        if self._renderer is None:
+            self._renderer = Renderer(
+                default_img_values=self._settings.default_img_values,
+                assets_dir=self._settings.paths.shared_dir,
+                global_factory=self,
+            )
+        return self._renderer
 
     def compiler(self) -> CompilerProtocol:
         from .compiler import Compiler
@@ -43,18 +47,26 @@ class GlobalSettingsFactory[T: "GlobalSettings"](GlobalFactoryProtocol):
             PltAssetsBuilder,
             TikzAssetsBuilder,
         )
+        from .assets_sources_cache import AssetsSourcesCache
 
+        sources_cache = AssetsSourcesCache(self._settings.paths.assets_sources_cache)
         return AssetsBuilder(
             assets_builders=(
-                PltAssetsBuilder(output_dir=self._settings.paths.shared_plt_pdf_dir),
+                PltAssetsBuilder(
+                    output_dir=self._settings.paths.shared_plt_pdf_dir,
+                    sources_cache=sources_cache,
+                ),
                 PlotlyAssetsBuilder(
-                    output_dir=self._settings.paths.shared_plotly_pdf_dir
+                    output_dir=self._settings.paths.shared_plotly_pdf_dir,
+                    sources_cache=sources_cache,
                 ),
                 TikzAssetsBuilder(
                     input_dir=self._settings.paths.tikz_dir,
                     output_dir=self._settings.paths.shared_tikz_pdf_dir,
+                    build_dir=self._settings.paths.tikz_build_dir,
                     assets_dir=self._settings.paths.shared_dir,
                     compiler=self.compiler(),
+                    sources_cache=sources_cache,
                 ),
             )
         )
@@ -80,6 +92,7 @@ class GlobalSettingsFactory[T: "GlobalSettings"](GlobalFactoryProtocol):
             assets_dir=self._settings.paths.shared_dir,
             git_dir=self._settings.paths.git_dir,
             renderer=self.renderer(),
+            assets_usage_cache_path=self._settings.paths.assets_usage_cache,
         )
 
 
@@ -0,0 +1,49 @@
+from json import JSONDecodeError, dumps, loads
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+
+class JsonCache[V]:
+    """Entries keyed by absolute paths and persisted in a single JSON file.
+
+    The file is shared by all repositories. Saving merges the entries updated by \
+    this instance into the ones currently on disk, so that concurrent runs do not \
+    lose each other's work, and drops the entries of files that do not exist anymore \
+    so that the cache does not grow forever.
+    """
+
+    def __init__(self, cache_path: Path) -> None:
+        self._cache_path = cache_path
+        self._entries: dict[str, V] = self._load()
+        self._updated: dict[str, V] = {}
+
+    def save(self) -> None:
+        if not self._updated:
+            return
+        entries = self._load()
+        entries.update(self._updated)
+        entries = {
+            path: entry for path, entry in entries.items() if Path(path).exists()
+        }
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            "w",
+            encoding="utf8",
+            dir=self._cache_path.parent,
+            prefix=f".{self._cache_path.name}.",
+            delete=False,
+        ) as fh:
+            fh.write(dumps(entries))
+        Path(fh.name).replace(self._cache_path)
+        self._entries = entries
+        self._updated = {}
+
+    def _update(self, path: Path, entry: V) -> None:
+        self._entries[str(path)] = entry
+        self._updated[str(path)] = entry
+
+    def _load(self) -> dict[str, V]:
+        try:
+            return loads(self._cache_path.read_text(encoding="utf8"))
+        except (FileNotFoundError, JSONDecodeError):
+            return {}
@@ -1,8 +1,8 @@
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from os.path import normpath
 from pathlib import Path, PurePath
 from sys import stderr
-from typing import Literal
+from typing import Any
 
 from pydantic import ValidationError
 from rich import print as rich_print
@@ -31,6 +31,9 @@ from ..models import (
 from ..utils import load_yaml
 from .protocols import ParserProtocol
 
+# Placeholder for nodes until they are resolved, paths are immutable so one is enough
+_UNRESOLVED_PATH = ResolvedPath(Path())
+
 
 class Parser(ParserProtocol):
     """Build a deck from a definition.
@@ -54,6 +57,20 @@ class Parser(ParserProtocol):
         self._local_latex_dir = local_latex_dir
         self._shared_latex_dir = shared_latex_dir
         self._file_extension = file_extension
+        # Parsed definitions, or parsing errors, of the sections met so far
+        self._section_definitions: dict[ResolvedPath, SectionDefinition | str] = {}
+        # Resolution results, shared includes are usually met many times in a deck
+        self._resolved_paths: dict[UnresolvedPath, ResolvedPath | None] = {}
+        # Set as soon as a node gets a parsing error during the current parse
+        self._parsing_failed = False
+        # Dispatch on the include type directly instead of chained isinstance checks
+        self._include_parsers: dict[
+            type[NodeInclude],
+            Callable[[Any, UnresolvedPath, str | None], Node],
+        ] = {
+            FileInclude: self._parse_file_include,
+            SectionInclude: self._parse_section_include,
+        }
 
     def from_deck_definition(self, deck_definition_path: Path) -> Deck:
         """Parse a deck from a yaml definition.
@@ -80,7 +97,7 @@ class Parser(ParserProtocol):
                     PartDefinition.model_construct(
                         name=PartName("part_name"),
                         sections=[
-                            SectionInclude(
+                            SectionInclude.model_construct(
                                 path=IncludePath(PurePath(section)), flavor=flavor
                             )
                         ],
@@ -98,7 +115,11 @@ class Parser(ParserProtocol):
                 [
                     PartDefinition.model_construct(
                         name=PartName("part_name"),
-                        sections=[FileInclude(path=IncludePath(PurePath(latex)))],
+                        sections=[
+                            FileInclude.model_construct(
+                                path=IncludePath(PurePath(latex))
+                            )
+                        ],
                     )
                 ]
             ),
@@ -109,33 +130,50 @@ class Parser(ParserProtocol):
     def _parse_parts(
         self, part_definitions: list[PartDefinition]
     ) -> dict[PartName, Part]:
-        parts = {}
-        for part_definition in part_definitions:
-            part_nodes: list[Node] = []
-            for node_include in part_definition.sections:
-                if isinstance(node_include, SectionInclude):
-                    part_nodes.append(
-                        self._parse_section(
-                            base_unresolved_path=UnresolvedPath(PurePath()),
-                            include_path=node_include.path,
-                            title=node_include.title,
-                            title_unset="title" not in node_include.model_fields_set,
-                            flavor=node_include.flavor,
-                        )
-                    )
-                else:
-                    part_nodes.append(
-                        self._parse_file(
-                            base_unresolved_path=UnresolvedPath(PurePath()),
-                            include_path=node_include.path,
-                            title=node_include.title,
-                        )
-                    )
-            parts[part_definition.name] = Part(
-                title=part_definition.title,
-                nodes=part_nodes,
-            )
-        return parts
+        self._parsing_failed = False
+        return {
+            part_definition.name: self._parse_part(part_definition)
+            for part_definition in part_definitions
+        }
+
+    def _parse_part(self, part_definition: PartDefinition) -> Part:
+        base_unresolved_path = UnresolvedPath(PurePath())
+        include_parsers = self._include_parsers
+        return Part(
+            title=part_definition.title,
+            nodes=[
+                include_parsers[type(node_include)](
+                    node_include, base_unresolved_path, node_include.title
+                )
+                for node_include in part_definition.sections
+            ],
+        )
+
+    def _parse_file_include(
+        self,
+        file_include: FileInclude,
+        base_unresolved_path: UnresolvedPath,
+        title: str | None,
+    ) -> File:
+        return self._parse_file(
+            base_unresolved_path=base_unresolved_path,
+            include_path=file_include.path,
+            title=title,
+        )
+
+    def _parse_section_include(
+        self,
+        section_include: SectionInclude,
+        base_unresolved_path: UnresolvedPath,
+        title: str | None,
+    ) -> Section:
+        return self._parse_section(
+            base_unresolved_path=base_unresolved_path,
+            include_path=section_include.path,
+            title=title,
+            title_unset="title" not in section_include.__pydantic_fields_set__,
+            flavor=section_include.flavor,
+        )
 
     def _parse_section(
         self,
@@ -151,7 +189,7 @@ class Parser(ParserProtocol):
         section = Section(
             title=title,
             unresolved_path=unresolved_path,
-            resolved_path=ResolvedPath(Path()),
+            resolved_path=_UNRESOLVED_PATH,
             parsing_error=None,
             flavor=flavor,
             nodes=[],
@@ -159,33 +197,28 @@ class Parser(ParserProtocol):
         definition_logical_path = (unresolved_path / unresolved_path.name).with_suffix(
             ".yml"
         )
-        definition_resolved_path = self._resolve(
-            definition_logical_path.with_suffix(".yml"), "file"
-        )
+        definition_resolved_path = self._resolve_file(definition_logical_path)
         if definition_resolved_path is None:
             section.parsing_error = (
                 f"unresolvable section definition path {definition_logical_path}"
             )
+            self._parsing_failed = True
             return section
         section.resolved_path = definition_resolved_path.parent
-        try:
-            content = load_yaml(definition_resolved_path)
-        except Exception as e:
-            section.parsing_error = f"{e}"
-            return section
-        try:
-            section_definition = SectionDefinition.model_validate(content)
-        except ValidationError as e:
-            section.parsing_error = f"{e}"
+        section_definition = self._section_definition(definition_resolved_path)
+        if isinstance(section_definition, str):
+            section.parsing_error = section_definition
+            self._parsing_failed = True
             return section
         for flavor_definition in section_definition.flavors:
             if flavor_definition.name == flavor:
                 break
         else:
             section.parsing_error = f"flavor {flavor} not found"
+            self._parsing_failed = True
             return section
         if title_unset:
-            if "title" in flavor_definition.model_fields_set:
+            if "title" in flavor_definition.__pydantic_fields_set__:
                 section.title = flavor_definition.title
             else:
                 section.title = section_definition.title
@@ -198,6 +231,24 @@ class Parser(ParserProtocol):
         )
         return section
 
+    def _section_definition(
+        self, definition_resolved_path: ResolvedPath
+    ) -> SectionDefinition | str:
+        if definition_resolved_path in self._section_definitions:
+            return self._section_definitions[definition_resolved_path]
+        section_definition: SectionDefinition | str
+        try:
+            content = load_yaml(definition_resolved_path)
+        except Exception as e:
+            section_definition = f"{e}"
+        else:
+            try:
+                section_definition = SectionDefinition.model_validate(content)
+            except ValidationError as e:
+                section_definition = f"{e}"
+        self._section_definitions[definition_resolved_path] = section_definition
+        return section_definition
+
     def _parse_nodes(
         self,
         node_includes: Iterable[NodeInclude],
@@ -205,35 +256,20 @@ class Parser(ParserProtocol):
         base_unresolved_path: UnresolvedPath,
     ) -> list[Node]:
         nodes: list[Node] = []
+        include_parsers = self._include_parsers
+        titles = default_titles or {}
         for node_include in node_includes:
             if node_include.title:
                 title = node_include.title
-            elif (
-                "title" not in node_include.model_fields_set
-                and default_titles
-                and node_include.path in default_titles
-            ):
-                title = default_titles[node_include.path]
-            else:
+            elif "title" in node_include.__pydantic_fields_set__:
                 title = None
-            if isinstance(node_include, FileInclude):
-                nodes.append(
-                    self._parse_file(
-                        base_unresolved_path=base_unresolved_path,
-                        include_path=node_include.path,
-                        title=title,
-                    )
-                )
-            if isinstance(node_include, SectionInclude):
-                nodes.append(
-                    self._parse_section(
-                        base_unresolved_path=base_unresolved_path,
-                        include_path=node_include.path,
-                        title=title,
-                        title_unset="title" not in node_include.model_fields_set,
-                        flavor=node_include.flavor,
-                    )
+            else:
+                title = titles.get(node_include.path)
+            nodes.append(
+                include_parsers[type(node_include)](
+                    node_include, base_unresolved_path, title
                 )
+            )
         return nodes
 
     def _parse_file(
@@ -248,16 +284,17 @@ class Parser(ParserProtocol):
         file = File(
             title=title,
             unresolved_path=unresolved_path,
-            resolved_path=ResolvedPath(Path()),
+            resolved_path=_UNRESOLVED_PATH,
             parsing_error=None,
         )
-        resolved_path = self._resolve(
-            unresolved_path.with_suffix(self._file_extension), "file"
+        resolved_path = self._resolve_file(
+            unresolved_path.with_suffix(self._file_extension)
         )
         if resolved_path:
             file.resolved_path = resolved_path
         else:
             file.parsing_error = f"unresolvable file path {unresolved_path}"
+            self._parsing_failed = True
         return file
 
     @staticmethod
@@ -270,19 +307,22 @@ class Parser(ParserProtocol):
             else PurePath(normpath(base_unresolved_path / include_path))
         )
 
-    def _resolve(
-        self, unresolved_path: UnresolvedPath, resolve_target: Literal["file", "dir"]
-    ) -> ResolvedPath | None:
-        local_path = self._local_latex_dir / unresolved_path
-        shared_path = self._shared_latex_dir / unresolved_path
-        existence_tester = Path.is_file if resolve_target == "file" else Path.is_dir
-        for path in [local_path, shared_path]:
-            if existence_tester(path):
-                return ResolvedPath(path.resolve())
-        return None
+    def _resolve_file(self, unresolved_path: UnresolvedPath) -> ResolvedPath | None:
+        if unresolved_path in self._resolved_paths:
+            return self._resolved_paths[unresolved_path]
+        resolved_path = None
+        for latex_dir in (self._local_latex_dir, self._shared_latex_dir):
+            path = latex_dir / unresolved_path
+            if path.is_file():
+                resolved_path = ResolvedPath(path.resolve())
+                break
+        self._resolved_paths[unresolved_path] = resolved_path
+        return resolved_path
 
-    @staticmethod
-    def _validate(deck: Deck) -> None:
+    def _validate(self, deck: Deck) -> None:
+        # Errors are flagged while parsing, only walk the deck again to report them
+        if not self._parsing_failed:
+            return
         tree = RichTreeVisitor().process(deck)
         if tree is not None:
             rich_print(tree, file=stderr)
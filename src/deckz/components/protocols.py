@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Protocol
 
@@ -44,10 +45,16 @@ class AssetsBuilderProtocol(Protocol):
 
 
 class CompilerProtocol(Protocol):
+    @property
+    def fingerprint(self) -> str: ...
+
     def compile(self, file: Path) -> "CompileResult": ...
 
 
 class RendererProtocol(Protocol):
+    @property
+    def fingerprint(self) -> str: ...
+
     def render_to_str(
         self, template_path: Path, /, **template_kwargs: Any
     ) -> tuple[str, "AssetsMetadata"]: ...
@@ -65,7 +72,7 @@ class AssetsMetadataRetrieverProtocol(Protocol):
 
 
 class AssetsSearcherProtocol(Protocol):
-    def search(self, asset: str) -> set["ResolvedPath"]: ...
+    def search(self, asset: str) -> Iterator["ResolvedPath"]: ...
 
 
 class AssetsAnalyzerProtocol(Protocol):
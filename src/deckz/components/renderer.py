@@ -4,10 +4,12 @@ from functools import cached_property
 from os.path import join as path_join
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 from jinja2 import BaseLoader, Environment, TemplateNotFound, pass_context
 from jinja2.runtime import Context
 
+from .. import __version__
 from ..configuring.settings import DefaultImageValues
 from ..models import AssetsMetadata
 from .protocols import GlobalFactoryProtocol, RendererProtocol
@@ -24,25 +26,44 @@ class _BaseRenderer(ABC, RendererProtocol):
         self, template_path: Path, output_path: Path, /, **template_kwargs: Any
     ) -> AssetsMetadata:
         from contextlib import suppress
-        from filecmp import cmp
-        from shutil import move
         from tempfile import NamedTemporaryFile
 
+        rendered, assets_metadata = self.render_to_str(template_path, **template_kwargs)
+        content = f"{rendered}\n".encode()
+        with suppress(FileNotFoundError):
+            if output_path.read_bytes() == content:
+                return assets_metadata
+        # Write next to the output so that the final rename is atomic
+        with NamedTemporaryFile(
+            "wb", dir=output_path.parent, prefix=f".{output_path.name}.", delete=False
+        ) as fh:
+            fh.write(content)
         try:
-            with NamedTemporaryFile("w", encoding="utf8", delete=False) as fh:
-                rendered, assets_metadata = self.render_to_str(
-                    template_path, **template_kwargs
-                )
-                fh.write(rendered)
-                fh.write("\n")
-            if not output_path.exists() or not cmp(fh.name, str(output_path)):
-                move(fh.name, output_path)
+            Path(fh.name).replace(output_path)
         finally:
             with suppress(FileNotFoundError):
                 Path(fh.name).unlink()
         return assets_metadata
 
 
+_ENV_OPTIONS: dict[str, Any] = {
+    "block_start_string": r"\BLOCK{",
+    "block_end_string": "}",
+    "variable_start_string": r"\V{",
+    "variable_end_string": "}",
+    "comment_start_string": r"\#{",
+    "comment_end_string": "}",
+    "line_statement_prefix": "%%",
+    "line_comment_prefix": "%#",
+    "trim_blocks": True,
+    "autoescape": False,
+}
+
+# Jinja environments built in this process, by renderer key, oldest first
+_ENVS_CACHE_SIZE = 8
+_envs: dict[str, Environment] = {}
+
+
 class _AbsoluteLoader(BaseLoader):
     def get_source(
         self, environment: Environment, template: str
@@ -69,6 +90,27 @@ class Renderer(_BaseRenderer):
         self._default_img_values = default_img_values
         self._assets_dir = assets_dir
         self._global_factory = global_factory
+        self._key = uuid4().hex
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The Jinja environment holds lambdas: let each process build its own
+        state = self.__dict__.copy()
+        state.pop("_env", None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        # Pool workers receive a new copy of the renderer with every task: reuse the
+        # environment, and its template cache, built for a previous copy
+        if (env := _envs.get(self._key)) is not None:
+            self.__dict__["_env"] = env
+
+    @property
+    def fingerprint(self) -> str:
+        # Everything besides the templates and their arguments that shapes the output
+        return repr(
+            (__version__, _ENV_OPTIONS, self._default_img_values, self._assets_dir)
+        )
 
     def render_to_str(
         self, template_path: Path, /, **template_kwargs: Any
@@ -85,22 +127,13 @@ class Renderer(_BaseRenderer):
 
     @cached_property
     def _env(self) -> Environment:
-        env = Environment(
-            loader=_AbsoluteLoader(),
-            block_start_string=r"\BLOCK{",
-            block_end_string="}",
-            variable_start_string=r"\V{",
-            variable_end_string="}",
-            comment_start_string=r"\#{",
-            comment_end_string="}",
-            line_statement_prefix="%%",
-            line_comment_prefix="%#",
-            trim_blocks=True,
-            autoescape=False,
-        )
+        env = Environment(loader=_AbsoluteLoader(), **_ENV_OPTIONS)
         env.filters["camelcase"] = self._to_camel_case
         env.filters["path_join"] = lambda paths: path_join(*paths)  # noqa: PTH118
         env.filters["image"] = self._img
+        _envs[self._key] = env
+        while len(_envs) > _ENVS_CACHE_SIZE:
+            del _envs[next(iter(_envs))]
         return env
 
     def _to_camel_case(self, string: str) -> str:
@@ -1,7 +1,7 @@
-from functools import reduce
 from pathlib import Path
 from typing import Annotated, Any, Self, cast
 
+from appdirs import user_cache_dir as appdirs_user_cache_dir
 from appdirs import user_config_dir as appdirs_user_config_dir
 from pydantic import (
     AfterValidator,
@@ -43,6 +43,7 @@ def _convert(input_value: str | Path, info: ValidationInfo) -> Path:
 
 _Path = Annotated[Path, BeforeValidator(_convert), AfterValidator(Path.resolve)]
 _user_config_dir = Path(appdirs_user_config_dir(app_name)).resolve()
+_user_cache_dir = Path(appdirs_user_cache_dir(app_name)).resolve()
 
 
 # ruff: noqa: RUF027
@@ -50,6 +51,7 @@ class GlobalPaths(BaseModel):
     model_config = ConfigDict(validate_default=True)
     current_dir: _Path
     user_config_dir: Path = _user_config_dir
+    user_cache_dir: Path = _user_cache_dir
     git_dir: _Path = Field(
         default_factory=lambda data: get_git_dir(data["current_dir"])
     )
@@ -66,6 +68,7 @@ class GlobalPaths(BaseModel):
     plt_dir: _Path = cast("Path", "{figures_dir}/plots")
     plotly_dir: _Path = cast("Path", "{figures_dir}/pltly")
     tikz_dir: _Path = cast("Path", "{figures_dir}/tikz")
+    tikz_build_dir: _Path = cast("Path", "{git_dir}/.build/tikz")
     jinja2_dir: _Path = cast("Path", "{templates_dir}/jinja2")
     jinja2_main_template: _Path = cast("Path", "{jinja2_dir}/main.tex")
     github_issues: _Path = cast("Path", "{user_config_dir}/github-issues.yml")
@@ -74,6 +77,8 @@ class GlobalPaths(BaseModel):
     gdrive_credentials: _Path = cast(
         "Path", "{user_config_dir}/gdrive-credentials.pickle"
     )
+    assets_usage_cache: _Path = cast("Path", "{user_cache_dir}/assets-usage.json")
+    assets_sources_cache: _Path = cast("Path", "{user_cache_dir}/assets-sources.json")
 
     def model_post_init(self, __context: Any) -> None:
         for field, value in self.__dict__.items():
@@ -98,15 +103,13 @@ class GlobalSettings(BaseModel):
     def from_yaml(cls, path: Path) -> Self:
         resolved_path = path.resolve()
         git_dir = get_git_dir(resolved_path).resolve()
-        content: dict[str, Any] = reduce(
-            lambda a, b: {**a, **b},
-            load_all_yamls(
-                d
-                for p in dirs_hierarchy(git_dir, _user_config_dir, resolved_path)
-                if (d := p / "deckz.yml").is_file()
-            ),
-            {},
-        )
+        content: dict[str, Any] = {}
+        for config in load_all_yamls(
+            d
+            for p in dirs_hierarchy(git_dir, _user_config_dir, resolved_path)
+            if (d := p / "deckz.yml").is_file()
+        ):
+            content.update(config)
         if "paths" not in content:
             content["paths"] = {}
         if "current_dir" not in content["paths"]:
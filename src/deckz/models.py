@@ -88,7 +88,7 @@ There are several kinds of types defined in this module:
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from pathlib import Path, PurePath
 from typing import Annotated, Any, NewType, Protocol
@@ -158,36 +158,45 @@ class FileInclude(NodeInclude):
     """
 
 
-def _normalize_include(
-    v: str | dict[str, str] | NodeInclude,
-) -> NodeInclude:
-    if isinstance(v, NodeInclude):
-        return v
-    if isinstance(v, str):
-        left = v
-        title_unset = True
-    else:
-        assert len(v) == 1
-        left, title = next(iter(v.items()))
-        title_unset = False
+def _split_include(left: str) -> tuple[str, str | None]:
     if left.startswith("$"):
         path, flavor = left[1:].split("@")
-    else:
-        path = left
-        flavor = None
-    if flavor is None and title_unset:
+        return path, flavor
+    return left, None
+
+
+def _normalize_str_include(v: str) -> NodeInclude:
+    path, flavor = _split_include(v)
+    if flavor is None:
         return FileInclude(path=IncludePath(PurePath(path)))
+    return SectionInclude(path=IncludePath(PurePath(path)), flavor=FlavorName(flavor))
+
+
+def _normalize_dict_include(v: dict[str, str]) -> NodeInclude:
+    # Unpacking also checks that there is exactly one item
+    ((left, title),) = v.items()
+    path, flavor = _split_include(left)
     if flavor is None:
         return FileInclude(path=IncludePath(PurePath(path)), title=title)
-    if title_unset:
-        return SectionInclude(
-            path=IncludePath(PurePath(path)), flavor=FlavorName(flavor)
-        )
     return SectionInclude(
         path=IncludePath(PurePath(path)), flavor=FlavorName(flavor), title=title
     )
 
 
+_include_normalizers: dict[type, Callable[[Any], NodeInclude]] = {
+    str: _normalize_str_include,
+    dict: _normalize_dict_include,
+}
+
+
+def _normalize_include(
+    v: str | dict[str, str] | NodeInclude,
+) -> NodeInclude:
+    if isinstance(v, NodeInclude):
+        return v
+    return _include_normalizers[type(v)](v)
+
+
 class FlavorDefinition(BaseModel):
     """Specify the different attributes of a flavor."""
 
@@ -257,7 +266,7 @@ class NodeVisitor[**P, T](Protocol):
         ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Node(ABC):
     """Node in a section or part.
 
@@ -294,7 +303,7 @@ class Node(ABC):
         raise NotImplementedError
 
 
-@dataclass
+@dataclass(slots=True)
 class File(Node):
     """File in a section or part."""
 
@@ -316,7 +325,7 @@ class File(Node):
         return visitor.visit_file(self, *args, **kwargs)
 
 
-@dataclass
+@dataclass(slots=True)
 class Section(Node):
     """Section in a section or part."""
 
@@ -344,7 +353,7 @@ class Section(Node):
         return visitor.visit_section(self, *args, **kwargs)
 
 
-@dataclass
+@dataclass(slots=True)
 class Part:
     """Part in a deck."""
 
@@ -355,7 +364,7 @@ class Part:
     """Nodes included in the part."""
 
 
-@dataclass
+@dataclass(slots=True)
 class Deck:
     """Top of the hierarchy for deck parsing."""
 
@@ -388,7 +397,7 @@ class Deck:
 ########################################################################################
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Title:
     """Define a title slide and its level.
 
@@ -410,7 +419,7 @@ TitleOrContent = Title | Content
 """Alias to title or content to denote any slide."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PartSlides:
     """Title and slides comprising a part."""
 
@@ -426,7 +435,7 @@ class PartSlides:
 ########################################################################################
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CompileResult:
     """Result of a compilation."""
 
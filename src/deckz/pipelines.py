@@ -10,7 +10,7 @@ from .components.factory import DeckSettingsFactory, GlobalSettingsFactory
 from .configuring.settings import DeckSettings, GlobalSettings
 from .configuring.variables import get_variables
 from .models import Deck, FlavorName, PartName
-from .utils import all_deck_settings
+from .utils import all_deck_settings, enable_yaml_cache, invalidate_yaml_cache
 
 _logger = getLogger(__name__)
 
@@ -21,10 +21,12 @@ def _build(
     build_handout: bool,
     build_presentation: bool,
     build_print: bool,
+    build_assets: bool = True,
 ) -> bool:
     variables = get_variables(settings)
     factory = DeckSettingsFactory(settings)
-    factory.assets_builder().build_assets()
+    if build_assets:
+        factory.assets_builder().build_assets()
     return factory.deck_builder(
         variables=variables,
         deck=deck,
@@ -96,6 +98,8 @@ def run_all(
     global_settings = GlobalSettings.from_yaml(directory)
     GlobalSettingsFactory(global_settings).assets_builder().build_assets()
     decks_settings = list(all_deck_settings(global_settings.paths.git_dir))
+    # Decks usually share the repository assets: build each set of them only once
+    built_assets = {_assets_key(global_settings)}
     with Progress(
         "[progress.description]{task.description}",
         BarColumn(),
@@ -103,6 +107,7 @@ def run_all(
     ) as progress:
         task_id = progress.add_task("Building decks…", total=len(decks_settings))
         for deck_settings in decks_settings:
+            assets_key = _assets_key(deck_settings)
             result = _build(
                 deck=DeckSettingsFactory(deck_settings)
                 .parser()
@@ -111,12 +116,26 @@ def run_all(
                 build_handout=build_handout,
                 build_presentation=build_presentation,
                 build_print=build_print,
+                build_assets=assets_key not in built_assets,
             )
+            built_assets.add(assets_key)
             if not result:
                 break
             progress.update(task_id, advance=1)
 
 
+def _assets_key(settings: GlobalSettings) -> tuple[Any, ...]:
+    paths = settings.paths
+    return (
+        settings.build_command,
+        paths.shared_dir,
+        paths.tikz_dir,
+        paths.shared_tikz_pdf_dir,
+        paths.shared_plt_pdf_dir,
+        paths.shared_plotly_pdf_dir,
+    )
+
+
 def run_assets(directory: Path) -> None:
     """Build all the project standalones (images, tikz, plots, etc).
 
@@ -140,13 +159,17 @@ def watch[**P](
         p.resolve() for dir_to_avoid in avoid for p in dir_to_avoid.glob("**")
     }
 
-    dirs_to_watch = watch | {
+    # Nested roots would have their subtree listed and watched twice
+    roots = _minimal_roots(watch)
+    dirs_to_watch = roots | {
         r_to_watch
-        for dir_to_watch in watch
+        for dir_to_watch in roots
         for p in dir_to_watch.glob("**")
         if (r_to_watch := p.resolve()) not in dirs_to_avoid
     }
     print("\n".join(sorted(str(d) for d in dirs_to_watch)))
+    # Configurations and section definitions rarely change between builds
+    enable_yaml_cache()
     _logger.info("Initial build")
     try:
         function(*function_args, **function_kwargs)
@@ -154,10 +177,21 @@ def watch[**P](
     except Exception as e:
         _logger.exception(str(e), extra={"markup": True})
 
-    for _ in watchfiles_watch(*dirs_to_watch, raise_interrupt=False, recursive=False):
+    for changes in watchfiles_watch(
+        *dirs_to_watch, raise_interrupt=False, recursive=False
+    ):
+        invalidate_yaml_cache(Path(path) for _, path in changes)
         _logger.info("Detected changes, starting a new build")
         try:
             function(*function_args, **function_kwargs)
             _logger.info("Build finished")
         except Exception as e:
             _logger.exception(str(e), extra={"markup": True})
+
+
+def _minimal_roots(paths: Iterable[Path]) -> frozenset[Path]:
+    roots: list[Path] = []
+    for path in sorted((p.resolve() for p in paths), key=lambda p: len(p.parts)):
+        if not any(path.is_relative_to(root) for root in roots):
+            roots.append(path)
+    return frozenset(roots)
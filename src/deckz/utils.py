@@ -1,11 +1,17 @@
 """Provide general utility functions that would not fit in other modules."""
 
+from collections import OrderedDict
 from collections.abc import Iterable, Iterator
 from contextlib import suppress
+from os import getpid
 from pathlib import Path
+from threading import Lock
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from multiprocessing.pool import Pool
+    from os import DirEntry
+
     from .configuring.settings import DeckSettings
     from .models import Deck
 
@@ -25,23 +31,27 @@ def copy_file_if_newer(original: Path, copy: Path) -> bool:
     """
     from shutil import copyfile
 
-    if copy.exists() and copy.stat().st_mtime > original.stat().st_mtime:
-        return False
-    copy.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if copy.stat().st_mtime > original.stat().st_mtime:
+            return False
+    except FileNotFoundError:
+        copy.parent.mkdir(parents=True, exist_ok=True)
     copyfile(original, copy)
     return True
 
 
-def import_module_and_submodules(package_name: str) -> None:
+def import_module_and_submodules(package_name: str, reload: bool = True) -> None:
     """Import all modules and submodules from a package.
 
     From https://github.com/allenai/allennlp/blob/master/allennlp/common/util.py.
 
     Args:
         package_name: Name of the package to fully import.
+        reload: Whether modules that were already imported should be reloaded.
     """
-    from importlib import import_module, reload
+    from importlib import import_module
     from importlib import invalidate_caches as importlib_invalidate_caches
+    from importlib import reload as importlib_reload
     from pkgutil import walk_packages
     from sys import modules
 
@@ -49,7 +59,8 @@ def import_module_and_submodules(package_name: str) -> None:
 
     if package_name in modules:
         module = modules[package_name]
-        reload(module)
+        if reload:
+            importlib_reload(module)
     else:
         module = import_module(package_name)
     path = getattr(module, "__path__", [])
@@ -63,7 +74,7 @@ def import_module_and_submodules(package_name: str) -> None:
         ):
             continue
         subpackage = f"{package_name}.{name}"
-        import_module_and_submodules(subpackage)
+        import_module_and_submodules(subpackage, reload)
 
 
 def dirs_hierarchy(
@@ -111,10 +122,89 @@ def get_git_dir(path: Path) -> Path:
     return Path(Repository(repository).workdir).resolve()
 
 
+_YAML_CACHE_SIZE = 128
+_yaml_cache: OrderedDict[Path, tuple[tuple[int, ...], Any]] = OrderedDict()
+_yaml_cache_lock = Lock()
+# Process that enabled the cache. Pool workers forked from it do not receive the
+# invalidations of its watch loop, so they keep reading the files directly
+_yaml_cache_pid: int | None = None
+
+
+def enable_yaml_cache() -> None:
+    """Keep the parsed yaml files of this process between calls to `load_yaml`.
+
+    Meant for long-running processes, like the watch loop, that should also call \
+    [`invalidate_yaml_cache`][deckz.utils.invalidate_yaml_cache] with the paths they \
+    see changing: on filesystems with coarse modification times, a quick edit that \
+    keeps the size of a file could otherwise go unnoticed.
+    """
+    global _yaml_cache_pid
+    _yaml_cache_pid = getpid()
+
+
+def invalidate_yaml_cache(paths: Iterable[Path]) -> None:
+    """Drop the cached parses of `paths`.
+
+    Args:
+        paths: Paths of the yaml files that changed.
+    """
+    with _yaml_cache_lock:
+        for path in paths:
+            _yaml_cache.pop(path, None)
+
+
+def parse_yaml(content: str | bytes) -> Any:
+    """Parse yaml content, with the libyaml loader when it is available.
+
+    Args:
+        content: The yaml content to parse.
+
+    Returns:
+        Parsed content.
+    """
+    from yaml import load
+
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader  # type: ignore[assignment]
+
+    return load(content, Loader=SafeLoader)
+
+
 def load_yaml(path: Path) -> Any:
-    from yaml import safe_load
+    """Load a yaml file.
+
+    Once [`enable_yaml_cache`][deckz.utils.enable_yaml_cache] was called, parsed \
+    files are kept in a small LRU cache validated by inode, modification time, change \
+    time and size. A deep copy is returned so that callers can modify the content \
+    freely.
 
-    return safe_load(path.read_text(encoding="utf8"))
+    Args:
+        path: Path of the yaml file to load.
+
+    Returns:
+        Content of the yaml file.
+    """
+    if _yaml_cache_pid != getpid():
+        return parse_yaml(path.read_text(encoding="utf8"))
+
+    from copy import deepcopy
+
+    stat = path.stat()
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+    with _yaml_cache_lock:
+        cached = _yaml_cache.get(path)
+        if cached is not None and cached[0] == key:
+            _yaml_cache.move_to_end(path)
+            return deepcopy(cached[1])
+    content = parse_yaml(path.read_text(encoding="utf8"))
+    with _yaml_cache_lock:
+        _yaml_cache[path] = (key, content)
+        _yaml_cache.move_to_end(path)
+        if len(_yaml_cache) > _YAML_CACHE_SIZE:
+            _yaml_cache.popitem(last=False)
+    return deepcopy(content)
 
 
 def load_all_yamls(paths: Iterable[Path]) -> Iterator[Any]:
@@ -123,6 +213,36 @@ def load_all_yamls(paths: Iterable[Path]) -> Iterator[Any]:
             yield load_yaml(path)
 
 
+_pool: "Pool | None" = None
+_pool_lock = Lock()
+
+
+def get_pool() -> "Pool":
+    """Return the process pool shared by all the builds of the current process.
+
+    The pool is created on first use and closed when the interpreter exits, so that \
+    the workers are started once instead of once per build step.
+
+    Returns:
+        The shared process pool. It must not be closed nor terminated by callers.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import atexit
+            from multiprocessing import Pool
+
+            _pool = Pool()
+            atexit.register(_close_pool)
+        return _pool
+
+
+def _close_pool() -> None:
+    if _pool is not None:
+        _pool.close()
+        _pool.join()
+
+
 def _parse_deck(settings: "DeckSettings") -> tuple[Path, "Deck"]:
     from .components.factory import DeckSettingsFactory
 
@@ -135,10 +255,9 @@ def _parse_deck(settings: "DeckSettings") -> tuple[Path, "Deck"]:
 
 
 def all_decks(git_dir: Path) -> dict[Path, "Deck"]:
-    from multiprocessing import Pool
-
-    with Pool() as pool:
-        return dict(pool.map(_parse_deck, list(all_deck_settings(git_dir))))
+    # Feed settings to the workers as they are loaded, so that parsing overlaps with
+    # the discovery of the remaining decks
+    return dict(get_pool().imap(_parse_deck, all_deck_settings(git_dir)))
 
 
 def all_deck_settings(git_dir: Path) -> Iterator["DeckSettings"]:
@@ -147,15 +266,70 @@ def all_deck_settings(git_dir: Path) -> Iterator["DeckSettings"]:
     Yields:
         Paths of each deck found.
     """
+    from concurrent.futures import ThreadPoolExecutor
+
     from .configuring.settings import DeckSettings
 
-    for targets_path in git_dir.rglob("deck.yml"):
-        yield DeckSettings.from_yaml(targets_path.parent)
+    # Each deck settings load is a chain of small independent file reads
+    with ThreadPoolExecutor() as executor:
+        yield from executor.map(
+            lambda path: DeckSettings.from_yaml(path.parent),
+            find_files(git_dir, "deck.yml"),
+        )
+
+
+def find_files(root: Path, *patterns: str) -> Iterator[Path]:
+    """Yield files matching any of `patterns` recursively from `root`.
+
+    This is a faster `Path.rglob` that finds several patterns in a single walk.
+
+    Hidden directories (e.g. `.git` or build directories) and `__pycache__` are not \
+    explored, and symbolic links to directories are not followed.
+
+    Args:
+        root: Directory to search from.
+        patterns: Shell-style patterns that the file names can match.
+
+    Yields:
+        Paths of the matching files.
+    """
+    for entry in scan_files(root, *patterns):
+        yield Path(entry.path)
+
+
+def scan_files(root: Path, *patterns: str) -> Iterator["DirEntry[str]"]:
+    """Yield directory entries of files matching any of `patterns` under `root`.
+
+    Same as [`find_files`][deckz.utils.find_files] but yields the `os.DirEntry` \
+    objects, whose `stat` results are cached and often free of any extra system call.
+
+    Args:
+        root: Directory to search from.
+        patterns: Shell-style patterns that the file names can match.
+
+    Yields:
+        Directory entries of the matching files.
+    """
+    from fnmatch import fnmatchcase
+    from os import scandir
+
+    to_visit = [str(root)]
+    while to_visit:
+        with (
+            suppress(FileNotFoundError, NotADirectoryError),
+            scandir(to_visit.pop()) as entries,
+        ):
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and entry.name != "__pycache__":
+                        to_visit.append(entry.path)
+                elif any(fnmatchcase(entry.name, p) for p in patterns):
+                    yield entry
 
 
 def section_files(latex_dirs: Iterator[Path]) -> Iterator[Path]:
     for latex_dir in latex_dirs:
-        yield from latex_dir.rglob("*.yml")
+        yield from find_files(latex_dir, "*.yml")
 
 
 def latex_dirs(git_dir: Path, shared_latex_dir: Path) -> Iterator[Path]:
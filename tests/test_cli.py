@@ -10,6 +10,7 @@ from pygit2 import init_repository
 from pytest import fixture
 
 from deckz.cli import main
+from deckz.components.renderer import Renderer
 
 
 @fixture
@@ -58,3 +59,43 @@ def test_check_all(working_dir: Path) -> None:
     n_pages, text = extract_info(working_dir / "pdf" / "abc-p1-presentation.pdf")
     assert n_pages == 14
     assert "John Doe" in text
+
+
+def test_print_handout(working_dir: Path) -> None:
+    with patch.object(
+        Renderer,
+        "render_to_path",
+        autospec=True,
+        side_effect=Renderer.render_to_path,
+    ) as render_to_path:
+        run_deckz("run", "--no-presentation")
+
+    print_flags = {
+        call.args[2].name: call.kwargs["print"]
+        for call in render_to_path.call_args_list
+        if call.args[1].name == "main.tex"
+    }
+    assert print_flags["abc-handout.tex"] is False
+    assert print_flags["abc-print-handout.tex"] is True
+    assert (working_dir / "pdf" / "abc-print-handout.pdf").is_file()
+
+
+def test_rebuild_only_outdated(working_dir: Path) -> None:
+    pdf_dir = working_dir / "pdf"
+
+    def pdf_mtimes() -> dict[str, int]:
+        return {p.name: p.stat().st_mtime_ns for p in pdf_dir.glob("*.pdf")}
+
+    run_deckz("run", "--no-print")
+    first_mtimes = pdf_mtimes()
+    run_deckz("run", "--no-print")
+    assert pdf_mtimes() == first_mtimes
+
+    (working_dir / "latex" / "first-section" / "intro.tex").touch()
+    run_deckz("run", "--no-print")
+    rebuilt = {n for n, m in pdf_mtimes().items() if m != first_mtimes[n]}
+    assert rebuilt == {
+        "abc-handout.pdf",
+        "abc-p1-handout.pdf",
+        "abc-p1-presentation.pdf",
+    }